@@ -1,140 +1,139 @@
 import os
 import sys
 import csv
+import contextlib
 from dotenv import load_dotenv
 from collections import Counter
-import requests
-import json
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from PyQt5 import uic
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QColor
 from PyQt5.QtWidgets import (
     QMainWindow,
     QApplication,
     QMessageBox,
     QFileDialog,
     QTableWidgetItem,
+    QSystemTrayIcon,
+    QStyle,
 )
+from trade_stream import TradeStreamThread
+import fetchers
+from models import TopProject, Pair, TopTrader, WalletStats, row, to_frame
+from trader_table import TopTraderTable
+from watchlist import Watchlist, FileNotifier, WebhookNotifier, DesktopNotifier
+from dedup import EXPORT_EXTENSIONS, best_rank
+from workers import Worker
+from history_store import HistoryStore
+from discovery import Discovery, DISCOVERY_MAX_PAGES
 
 load_dotenv()
-dexscreener_request_url = os.getenv("DEXSCREENER_REQUEST_URL")
-gmgn_request_url = os.getenv("GMGN_REQUEST_URL")
+watchlist_webhook_url = os.getenv("WATCHLIST_WEBHOOK_URL")
 
-Ui_MainWindow, QtBaseClass = uic.loadUiType("interface.ui")
+TRADER_CONCURRENCY = 4
+WALLET_CHUNK_SIZE = 50
+WALLET_CONCURRENCY = 2
+CHANGED_PROJECT_COLOR = QColor(255, 243, 176)
+UI_FILE = "interface.ui"
 
 
-class ProjectThread(QThread):
-    result_signal = pyqtSignal(list)
+class ProjectThread(Worker):
+    error_message = "Error fetching top project data"
 
-    def __init__(self):
+    def __init__(self, discovery):
         super().__init__()
+        self.discovery = discovery
 
-    def run(self):
-        try:
-            self.result_signal.emit(self.get_top_project())
-        except Exception as e:
-            print(f"Error fetching top project data: {e}")
-            self.result_signal.emit([])
-
-    def get_top_project(self):
-        url = f"{dexscreener_request_url}/get-top-project"
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                return response.json()["message"]
-            print(f"Failed to retrieve data. Status code: {response.status_code}")
-            return []
-        except requests.exceptions.RequestException as e:
-            print(f"HTTP Request failed: {e}")
-            return []
+    def process(self, chunk):
+        pages = fetchers.top_project_pages(
+            self.request_timeout, self.is_cancelled, DISCOVERY_MAX_PAGES, self.deadline
+        )
+        ranked = self.discovery.rank(
+            [
+                (project.contract_address, project.volume, project.created_at, project)
+                for project in page
+            ]
+            for page in pages
+        )
+        # The top-k is shown in full; the tokens that are new to it or whose
+        # score moved are flagged as the ones worth a trader lookup.
+        selected = self.discovery.select(ranked)
+        if ranked and not self.is_cancelled():
+            self.discovery.mark_pushed(ranked, selected)
+        changed = {token for _, token, _ in selected}
+        return [
+            (project, token in changed)
+            for _, token, project in ranked[: self.discovery.top_k]
+        ]
 
 
-class PairAddressThread(QThread):
-    result_signal = pyqtSignal(list)
+class PairAddressThread(Worker):
+    error_message = "Error fetching pair address"
 
     def __init__(self, contract_address):
-        super().__init__()
+        super().__init__([contract_address])
         self.contract_address = contract_address
 
-    def run(self):
-        try:
-            pair_address_list = self.pair_address_from_CA(self.contract_address)
-            self.result_signal.emit([item["pairAddress"] for item in pair_address_list])
-        except Exception as e:
-            print(f"Error fetching pair address: {e}")
-            self.result_signal.emit([])
-
-    def pair_address_from_CA(self, contract_address):
-        response = requests.get(
-            f"https://api.dexscreener.com/token-pairs/v1/solana/{contract_address}",
-            headers={},
+    def process(self, chunk):
+        return fetchers.pair_address_from_CA(
+            chunk[0], self.request_timeout(), self.is_cancelled, self.deadline
         )
-        return response.json()
 
 
-class TraderThread(QThread):
-    result_signal = pyqtSignal(list)
+class TraderThread(Worker):
+    error_message = "Error fetching top trader data"
 
     def __init__(self, pair_address_list):
-        super().__init__()
+        super().__init__(pair_address_list, concurrency=TRADER_CONCURRENCY)
         self.pair_address_list = pair_address_list
 
-    def run(self):
-        try:
-            self.result_signal.emit(self.dexscreener(self.pair_address_list))
-        except Exception as e:
-            print(f"Error fetching top trader data: {e}")
-            self.result_signal.emit([])
-
-    def dexscreener(self, pair_address_list):
-        url = f"{dexscreener_request_url}/get-top-trader"
-        headers = {"Content-Type": "application/json"}
-        data = {"pair_address_list": pair_address_list}
-        try:
-            response = requests.get(url, headers=headers, data=json.dumps(data))
-            if response.status_code == 200:
-                return response.json()["message"]
-            print(f"Failed to retrieve data. Status code: {response.status_code}")
-            return []
-        except requests.exceptions.RequestException as e:
-            print(f"HTTP Request failed: {e}")
-            return []
+    def process(self, chunk):
+        return fetchers.top_traders_for_pair(
+            chunk[0], self.request_timeout(), self.is_cancelled, self.deadline
+        )
 
 
-class WalletThread(QThread):
-    result_signal = pyqtSignal(list)
+class WalletThread(Worker):
+    error_message = "Error fetching wallet info"
 
     def __init__(self, wallet_address_list):
-        super().__init__()
+        super().__init__(
+            wallet_address_list,
+            chunk_size=WALLET_CHUNK_SIZE,
+            concurrency=WALLET_CONCURRENCY,
+        )
         self.wallet_address_list = wallet_address_list
 
-    def run(self):
-        try:
-            wallet_info_list = self.gmgn(self.wallet_address_list)
-            self.result_signal.emit(wallet_info_list)
-        except Exception as e:
-            print(f"Error fetching wallet info: {e}")
+    def process(self, chunk):
+        return fetchers.gmgn(
+            chunk, self.request_timeout(), self.is_cancelled, self.deadline
+        )
+
+
+class DedupThread(Worker):
+    """Merge exports off the UI thread; ``error`` holds why a merge failed."""
+
+    error_message = "Error reading files"
 
-    def gmgn(self, wallet_address_list):
-        url = f"{gmgn_request_url}/get-wallet-info"
-        headers = {"Content-Type": "application/json"}
-        data = {"wallet_address_list": wallet_address_list}
+    def __init__(self, file_paths):
+        super().__init__(timeout=None)
+        self.file_paths = file_paths
+        self.error = None
+
+    def process(self, chunk):
         try:
-            response = requests.get(url, headers=headers, data=json.dumps(data))
-            if response.status_code == 200:
-                response_data = response.json()
-                return response_data["message"]
-            else:
-                print(f"Failed to retrieve data. Status code: {response.status_code}")
-                return []
-        except requests.exceptions.RequestException as e:
-            print(f"HTTP Request failed: {e}")
+            return [best_rank(self.file_paths)]
+        except Exception as e:
+            self.error = e
             return []
 
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super(MainWindow, self).__init__()
+        # Loaded here rather than at import: dedup's spawned Excel readers
+        # re-import this module and have no use for the UI.
+        Ui_MainWindow, _ = uic.loadUiType(UI_FILE)
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
 
@@ -151,6 +150,7 @@ class MainWindow(QMainWindow):
         # Top Trader Tracker
         self.ui.get_top_trader_btn.clicked.connect(self.get_top_trader)
         self.ui.save_top_trader_btn.clicked.connect(self.save_top_trader)
+        self.ui.live_top_trader_btn.clicked.connect(self.toggle_live_top_trader)
 
         # Excel Parser
         self.ui.import_removal_btn.clicked.connect(self.upload_removal_files)
@@ -161,52 +161,71 @@ class MainWindow(QMainWindow):
         self.ui.import_duplicates_btn.clicked.connect(self.upload_duplicates_files)
         self.ui.extract_duplicates_btn.clicked.connect(self.extract_duplicates)
         self.ui.save_duplicates_btn.clicked.connect(self.save_duplicates)
+        self.ui.watch_duplicates_btn.clicked.connect(self.watch_duplicates)
 
         # GMGN Tracker
         self.ui.get_wallet_info_btn.clicked.connect(self.get_wallet_info)
         self.ui.save_wallet_info_btn.clicked.connect(self.save_wallet_info)
+        self.ui.watch_wallets_btn.clicked.connect(self.watch_wallet_info)
+
+        # Watchlist alerts
+        self.watchlist = Watchlist(notifiers=self.watchlist_notifiers())
 
+        # Token ranking that scans past the first page of top projects
+        self.discovery = Discovery()
+
+        # Fetch history, written off the UI thread one snapshot at a time
+        self.history = HistoryStore()
+        self.history_executor = ThreadPoolExecutor(max_workers=1)
+        self.history_executor.submit(self.run_history_task, self.history.maintain)
+
+        self.top_projects = []
+        self.pair_list = []
+        self.wallet_info_list = []
+        self.cleaned_frame = None
         self.wallet_address = ""
         self.contract_address = ""
+        self.project_thread = None
+        self.pair_address_thread = None
         self.trader_thread = None
+        self.wallet_thread = None
+        self.dedup_thread = None
+        self.retired_workers = set()
+        self.top_traders = TopTraderTable()
+        self.trade_stream_thread = None
         self.running_pair_address_api = False
         self.running_dexscreener_api = False
         self.running_gmgn_api = False
 
-    # Get top 30 projects on defined.fi (Top Project Tracker)
+    # Get the best-scored projects across the full ranking (Top Project Tracker)
     def get_top_project(self):
+        if self.cancel_worker("project_thread", self.ui.get_top_project_btn):
+            return
+
         self.ui.top_project_viewer.clear()
-        self.ui.get_top_project_btn.setEnabled(False)
-        self.project_thread = ProjectThread()
-        self.project_thread.result_signal.connect(self.load_top_projects)
-        self.project_thread.start()
-
-    def load_top_projects(self, output_contract_addresses):
-        self.ui.top_project_viewer.setColumnCount(5)
-        self.ui.top_project_viewer.setRowCount(len(output_contract_addresses))
-        self.ui.top_project_viewer.setHorizontalHeaderLabels(
-            ["Name", "Symbol", "Contract Address", "Volume"]
+        self.discovery.smart_money = set(self.watchlist.wallets)
+        self.start_worker(
+            "project_thread",
+            ProjectThread(self.discovery),
+            self.load_top_projects,
+            self.ui.get_top_project_btn,
         )
 
-        for row_index, item in enumerate(output_contract_addresses):
-            self.ui.top_project_viewer.setItem(
-                row_index, 0, QTableWidgetItem(str(item["token_name"]))
-            )
-            self.ui.top_project_viewer.setItem(
-                row_index, 1, QTableWidgetItem(str(item["token_symbol"]))
-            )
-            self.ui.top_project_viewer.setItem(
-                row_index, 2, QTableWidgetItem(str(item["contract_address"]))
-            )
-            self.ui.top_project_viewer.setItem(
-                row_index, 3, QTableWidgetItem(str(item["volume"]))
-            )
-
-        self.ui.top_project_viewer.resizeColumnsToContents()
+    def load_top_projects(self, ranked_projects, fetched_at):
+        top_projects = [project for project, _ in ranked_projects]
+        self.top_projects = top_projects
+        viewer = self.ui.top_project_viewer
+        self.fill_table(viewer, TopProject, top_projects)
+        # Highlight the tokens that are new to the top-k or have moved.
+        for row_index, (_, changed) in enumerate(ranked_projects):
+            if changed:
+                for col_index in range(viewer.columnCount()):
+                    viewer.item(row_index, col_index).setBackground(CHANGED_PROJECT_COLOR)
+        self.record_history("projects", top_projects, fetched_at)
         self.ui.get_top_project_btn.setEnabled(True)
 
     def save_top_projects(self):
-        if self.ui.top_project_viewer.rowCount() == 0:
+        if not self.top_projects:
             QMessageBox.warning(self, "Warning", "No top projects data to save!")
             return
 
@@ -217,40 +236,15 @@ class MainWindow(QMainWindow):
         if not file_path:
             return
 
-        try:
-            with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.writer(csvfile)
-
-                headers = [
-                    "Name",
-                    "Symbol",
-                    "Contract Address",
-                    "Volume",
-                ]
-                writer.writerow(headers)
-
-                for row in range(self.ui.top_project_viewer.rowCount()):
-                    row_data = []
-                    for col in range(self.ui.top_project_viewer.columnCount()):
-                        item = self.ui.top_project_viewer.item(row, col)
-                        if item is not None:
-                            row_data.append(item.text())
-                        else:
-                            row_data.append("")
-                    writer.writerow(row_data)
-
-            QMessageBox.information(
-                self,
-                "Success",
-                f"Saved as CSV file successfully!\nLocation: {file_path}",
-            )
-        except Exception as e:
-            QMessageBox.critical(
-                self, "Error", f"An error occurred while saving the file:\n{str(e)}"
-            )
+        self.save_records(file_path, TopProject, self.top_projects)
 
     # Get pair address for given contract address on dexscreener using dexscreener api (Pair Address from Dexscreener)
     def get_pair_address_from_dex(self):
+        if self.cancel_worker(
+            "pair_address_thread", self.ui.get_pair_address_from_dex_btn
+        ):
+            return
+
         self.contract_address = self.ui.contract_address.text()
 
         if len(self.contract_address) == 0:
@@ -259,15 +253,18 @@ class MainWindow(QMainWindow):
 
         self.ui.pair_address_from_dex_viewer.clear()
         self.running_pair_address_api = True
-        self.ui.get_pair_address_from_dex_btn.setEnabled(False)
-        self.pair_address_thread = PairAddressThread(self.contract_address)
-        self.pair_address_thread.result_signal.connect(self.load_pair_address)
-        self.pair_address_thread.start()
+        self.start_worker(
+            "pair_address_thread",
+            PairAddressThread(self.contract_address),
+            self.load_pair_address,
+            self.ui.get_pair_address_from_dex_btn,
+        )
 
-    def load_pair_address(self, pair_address_list):
+    def load_pair_address(self, pair_list, fetched_at):
         try:
-            for url in pair_address_list:
-                self.ui.pair_address_from_dex_viewer.addItem(url)
+            self.pair_list = pair_list
+            for pair in pair_list:
+                self.ui.pair_address_from_dex_viewer.addItem(pair.pair_address)
             self.ui.get_pair_address_from_dex_btn.setEnabled(True)
             self.running_pair_address_api = False
         except Exception as e:
@@ -294,30 +291,13 @@ class MainWindow(QMainWindow):
         if not file_path:
             return
 
-        pair_address_list = [
-            self.ui.pair_address_from_dex_viewer.item(i).text()
-            for i in range(self.ui.pair_address_from_dex_viewer.count())
-        ]
-
-        try:
-            with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(["Pair_Address",])
-                for address in pair_address_list:
-                    writer.writerow([address])
-
-            QMessageBox.information(
-                self,
-                "Success",
-                f"Saved as CSV file successfully!\nLocation: {file_path}",
-            )
-        except Exception as e:
-            QMessageBox.critical(
-                self, "Error", f"An error occurred while saving the file:\n{str(e)}"
-            )
+        self.save_records(file_path, Pair, self.pair_list)
 
     # Get top 100 traders for given pair address on dexscreener (Top Trader Tracker)
     def get_top_trader(self):
+        if self.cancel_worker("trader_thread", self.ui.get_top_trader_btn):
+            return
+
         pair_address_list = [
             item
             for item in self.ui.pair_address.toPlainText().split("\n")
@@ -329,20 +309,88 @@ class MainWindow(QMainWindow):
 
         self.ui.top_trader_viewer.clear()
         self.running_dexscreener_api = True
-        self.ui.get_top_trader_btn.setEnabled(False)
-        self.trader_thread = TraderThread(pair_address_list)
-        self.trader_thread.result_signal.connect(self.load_top_trader)
-        self.trader_thread.start()
+        self.ui.live_top_trader_btn.setEnabled(False)
+        self.start_worker(
+            "trader_thread",
+            TraderThread(pair_address_list),
+            self.load_top_trader,
+            self.ui.get_top_trader_btn,
+            self.check_watchlist,
+        )
+
+    def check_watchlist(self, top_trader_list, fetched_at):
+        # Called per pair as it comes back, so a tracked wallet alerts as soon
+        # as its pair is fetched rather than after the whole batch.
+        self.watchlist.check(top_trader_list, fetched_at)
 
-    def load_top_trader(self, top_trader_list):
+    def load_top_trader(self, top_trader_list, fetched_at):
         try:
-            for url in top_trader_list:
-                self.ui.top_trader_viewer.addItem(url)
+            self.top_traders = TopTraderTable(top_trader_list)
+            self.ui.top_trader_viewer.addItems(self.top_traders.wallets())
+            if top_trader_list:
+                self.observe_token_traders()
+            self.record_history("top_traders", top_trader_list, fetched_at)
             self.ui.get_top_trader_btn.setEnabled(True)
+            self.ui.live_top_trader_btn.setEnabled(True)
             self.running_dexscreener_api = False
         except Exception as e:
             print(f"Error loading JSON data: {e}")
 
+    def observe_token_traders(self):
+        # Feed each token's trader set back into discovery so smart-money
+        # overlap counts towards its score on the next top project fetch.
+        contract_addresses = {
+            pair.pair_address: pair.contract_address for pair in self.pair_list
+        }
+        for pair_address in self.top_traders.pairs():
+            contract_address = contract_addresses.get(pair_address)
+            if contract_address:
+                self.discovery.observe_traders(
+                    contract_address,
+                    [
+                        record.wallet_address
+                        for record in self.top_traders.for_pair(pair_address)
+                    ],
+                )
+        self.discovery.save()
+
+    # Keep top traders current from the live trade stream instead of polling
+    def toggle_live_top_trader(self):
+        if self.trade_stream_thread is not None and self.trade_stream_thread.isRunning():
+            self.trade_stream_thread.stop()
+            self.ui.live_top_trader_btn.setEnabled(False)
+            return
+
+        pair_address_list = [
+            item.strip()
+            for item in self.ui.pair_address.toPlainText().split("\n")
+            if item.strip()
+        ]
+        if not pair_address_list:
+            QMessageBox.warning(self, "Warning", "Input one or more pair address!")
+            return
+
+        self.ui.top_trader_viewer.clear()
+        self.running_dexscreener_api = True
+        self.ui.get_top_trader_btn.setEnabled(False)
+        self.ui.live_top_trader_btn.setText("Stop Live")
+        self.trade_stream_thread = TradeStreamThread(pair_address_list)
+        self.trade_stream_thread.result_signal.connect(self.load_live_top_trader)
+        self.trade_stream_thread.finished.connect(self.stop_live_top_trader)
+        self.trade_stream_thread.start()
+
+    def load_live_top_trader(self, top_trader_list, fetched_at):
+        self.top_traders = TopTraderTable(top_trader_list)
+        self.ui.top_trader_viewer.clear()
+        self.ui.top_trader_viewer.addItems(self.top_traders.wallets())
+        self.watchlist.check(top_trader_list, fetched_at)
+
+    def stop_live_top_trader(self):
+        self.ui.live_top_trader_btn.setText("Start Live")
+        self.ui.live_top_trader_btn.setEnabled(True)
+        self.ui.get_top_trader_btn.setEnabled(True)
+        self.running_dexscreener_api = False
+
     def save_top_trader(self):
         if self.running_dexscreener_api:
             QMessageBox.warning(
@@ -350,7 +398,7 @@ class MainWindow(QMainWindow):
             )
             return
 
-        if self.ui.top_trader_viewer.count() == 0:
+        if len(self.top_traders) == 0:
             QMessageBox.warning(self, "Warning", "No wallet addresses found!")
             return
 
@@ -361,91 +409,85 @@ class MainWindow(QMainWindow):
         if not file_path:
             return
 
-        try:
-            with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.writer(csvfile)
-
-                writer.writerow(["Wallet Address", "Rank"])
+        self.save_records(file_path, TopTrader, self.top_traders.records())
 
-                top_trader_list = [
-                    self.ui.top_trader_viewer.item(i).text()
-                    for i in range(self.ui.top_trader_viewer.count())
-                ]
-                for index, value in enumerate(top_trader_list):
-                    writer.writerow([value, (index % 100) + 1])
-
-            QMessageBox.information(
-                self,
-                "Success",
-                f"Saved as CSV file successfully!\nLocation: {file_path}",
-            )
-        except Exception as e:
-            QMessageBox.critical(
-                self, "Error", f"An error occurred while saving the file:\n{str(e)}"
-            )
-
-    # Upload excel file to remove duplicates (Excel Parser)
+    # Upload excel files to remove duplicates (Excel Parser)
     def upload_removal_files(self):
         options = QFileDialog.Options()
-        file_name, _ = QFileDialog.getOpenFileName(
+        file_names, _ = QFileDialog.getOpenFileNames(
             self,
             "Open Excel Files",
             "",
             "Excel Files (*.xlsx; *.xls; *.csv)",
             options=options,
         )
-        if file_name:
+        if file_names:
             self.ui.input_removal_file.clear()
-            self.ui.input_removal_file.addItem(file_name)
+            for item in file_names:
+                self.ui.input_removal_file.addItem(item)
 
     def remove_duplicates(self):
+        if self.cancel_worker("dedup_thread", self.ui.remove_duplicates_btn):
+            return
         if self.ui.input_removal_file.count() == 0:
             QMessageBox.warning(self, "Warning", "Please import an Excel or CSV file.")
             return
 
-        file_path = self.ui.input_removal_file.item(0).text()
+        file_paths = [
+            self.ui.input_removal_file.item(i).text()
+            for i in range(self.ui.input_removal_file.count())
+        ]
 
-        if not (
-            file_path.endswith(".xlsx")
-            or file_path.endswith(".xls")
-            or file_path.endswith(".csv")
-        ):
+        unsupported = [
+            file_path
+            for file_path in file_paths
+            if not file_path.endswith(EXPORT_EXTENSIONS)
+        ]
+        if unsupported:
             QMessageBox.warning(
                 self,
                 "Warning",
-                "Unsupported file type! Please import an Excel or CSV file.",
+                f"Unsupported file type: {unsupported[0]}! Please import Excel or CSV files only.",
             )
             self.ui.input_removal_file.clear()
             return
 
-        if file_path.endswith(".csv"):
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path)
+        self.start_worker(
+            "dedup_thread",
+            DedupThread(file_paths),
+            self.load_removed_duplicates,
+            self.ui.remove_duplicates_btn,
+        )
 
-        df_cleaned = df.drop_duplicates(subset=["Wallet Address"], keep="first")
+    def load_removed_duplicates(self, frames, fetched_at):
+        if self.dedup_thread.error is not None:
+            QMessageBox.warning(
+                self, "Error", f"Error reading files: {str(self.dedup_thread.error)}"
+            )
+            return
+        if not frames:
+            return
 
-        self.show_removed_duplicates(df_cleaned)
+        self.cleaned_frame = frames[0]
+        self.show_removed_duplicates(self.cleaned_frame)
 
     def show_removed_duplicates(self, df_cleaned):
-        self.ui.remove_duplicates_viewer.setColumnCount(2)
+        self.ui.remove_duplicates_viewer.setColumnCount(3)
         self.ui.remove_duplicates_viewer.setRowCount(len(df_cleaned))
         self.ui.remove_duplicates_viewer.setHorizontalHeaderLabels(
-            ["Wallet Address", "Rank"]
+            ["Wallet Address", "Rank", "Source"]
         )
 
-        for row_index, (_, row) in enumerate(df_cleaned.iterrows()):
-            self.ui.remove_duplicates_viewer.setItem(
-                row_index, 0, QTableWidgetItem(str(row["Wallet Address"]))
-            )
-            self.ui.remove_duplicates_viewer.setItem(
-                row_index, 1, QTableWidgetItem(str(row["Rank"]))
-            )
+        for row_index, values in enumerate(df_cleaned.itertuples(index=False)):
+            for col_index, value in enumerate(values):
+                self.ui.remove_duplicates_viewer.setItem(
+                    row_index, col_index, QTableWidgetItem(str(value))
+                )
 
         self.ui.remove_duplicates_viewer.resizeColumnsToContents()
 
     def save_remove_duplicates(self):
-        if self.ui.remove_duplicates_viewer.rowCount() == 0:
+        if self.cleaned_frame is None or self.cleaned_frame.empty:
             QMessageBox.warning(self, "Warning", "No cleaned data to save!")
             return
 
@@ -457,21 +499,7 @@ class MainWindow(QMainWindow):
             return
 
         try:
-            with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.writer(csvfile)
-
-                headers = ["Wallet Address", "Rank"]
-                writer.writerow(headers)
-
-                for row in range(self.ui.remove_duplicates_viewer.rowCount()):
-                    row_data = []
-                    for col in range(self.ui.remove_duplicates_viewer.columnCount()):
-                        item = self.ui.remove_duplicates_viewer.item(row, col)
-                        if item is not None:
-                            row_data.append(item.text())
-                        else:
-                            row_data.append("")
-                    writer.writerow(row_data)
+            self.cleaned_frame.to_csv(file_path, index=False, encoding="utf-8")
 
             QMessageBox.information(
                 self,
@@ -613,6 +641,9 @@ class MainWindow(QMainWindow):
 
     # Get wallet information on gmgn.ai
     def get_wallet_info(self):
+        if self.cancel_worker("wallet_thread", self.ui.get_wallet_info_btn):
+            return
+
         wallet_address_list = [
             item
             for item in self.ui.wallet_address.toPlainText().split("\n")
@@ -624,12 +655,14 @@ class MainWindow(QMainWindow):
 
         self.ui.wallet_info_viewer.clear()
         self.running_gmgn_api = True
-        self.ui.get_wallet_info_btn.setEnabled(False)
-        self.wallet_thread = WalletThread(wallet_address_list)
-        self.wallet_thread.result_signal.connect(self.load_wallet_info)
-        self.wallet_thread.start()
+        self.start_worker(
+            "wallet_thread",
+            WalletThread(wallet_address_list),
+            self.load_wallet_info,
+            self.ui.get_wallet_info_btn,
+        )
 
-    def load_wallet_info(self, wallet_info_list):
+    def load_wallet_info(self, wallet_info_list, fetched_at):
         if len(wallet_info_list) == 0:
             QMessageBox.warning(
                 self, "Warning", "No wallets matching your filter were found!"
@@ -639,65 +672,11 @@ class MainWindow(QMainWindow):
             return
 
         self.wallet_info_list = wallet_info_list
-        self.ui.wallet_info_viewer.setColumnCount(11)
-        self.ui.wallet_info_viewer.setRowCount(len(wallet_info_list))
-        self.ui.wallet_info_viewer.setHorizontalHeaderLabels(
-            [
-                "Wallet Address",
-                "Win Rate",
-                "Transactions",
-                "PnL",
-                "Distribution",
-                "500%",
-                "200% ~ 500%",
-                "0% ~ 200%",
-                "0% ~ -50%",
-                "-50%",
-                "10 Sec Dump",
-            ]
-        )
-
-        for row_index, item in enumerate(wallet_info_list):
-            self.load_one_wallet_info(row_index, item)
-        self.ui.wallet_info_viewer.resizeColumnsToContents()
+        self.fill_table(self.ui.wallet_info_viewer, WalletStats, wallet_info_list)
+        self.record_history("wallets", wallet_info_list, fetched_at)
         self.ui.get_wallet_info_btn.setEnabled(True)
         self.running_gmgn_api = False
 
-    def load_one_wallet_info(self, row_index, item):
-        self.ui.wallet_info_viewer.setItem(
-            row_index, 0, QTableWidgetItem(str(item["wallet_address"]))
-        )
-        self.ui.wallet_info_viewer.setItem(
-            row_index, 1, QTableWidgetItem(str(item["win_rate"]))
-        )
-        self.ui.wallet_info_viewer.setItem(
-            row_index, 2, QTableWidgetItem(str(item["transactions"]))
-        )
-        self.ui.wallet_info_viewer.setItem(
-            row_index, 3, QTableWidgetItem(str(item["pnl"]))
-        )
-        self.ui.wallet_info_viewer.setItem(
-            row_index, 4, QTableWidgetItem(str(item["distribution_num"]))
-        )
-        self.ui.wallet_info_viewer.setItem(
-            row_index, 5, QTableWidgetItem(str(item["distribution"][0]))
-        )
-        self.ui.wallet_info_viewer.setItem(
-            row_index, 6, QTableWidgetItem(str(item["distribution"][1]))
-        )
-        self.ui.wallet_info_viewer.setItem(
-            row_index, 7, QTableWidgetItem(str(item["distribution"][2]))
-        )
-        self.ui.wallet_info_viewer.setItem(
-            row_index, 8, QTableWidgetItem(str(item["distribution"][3]))
-        )
-        self.ui.wallet_info_viewer.setItem(
-            row_index, 9, QTableWidgetItem(str(item["distribution"][4]))
-        )
-        self.ui.wallet_info_viewer.setItem(
-            row_index, 10, QTableWidgetItem(str(item["dumps"]))
-        )
-
     def save_wallet_info(self):
         if self.running_gmgn_api == True:
             QMessageBox.warning(
@@ -705,10 +684,7 @@ class MainWindow(QMainWindow):
             )
             return
 
-        row_count = self.ui.wallet_info_viewer.rowCount()
-        column_count = self.ui.wallet_info_viewer.columnCount()
-
-        if row_count == 0:
+        if not self.wallet_info_list:
             QMessageBox.warning(self, "Warning", "Not found wallet address!")
             return
 
@@ -719,34 +695,23 @@ class MainWindow(QMainWindow):
         if not file_path:
             return
 
-        try:
-            with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.writer(csvfile)
+        self.save_records(file_path, WalletStats, self.wallet_info_list)
 
-                headers = [
-                    "Wallet Address",
-                    "Win Rate",
-                    "Transactions",
-                    "PnL",
-                    "Distribution",
-                    "500%",
-                    "200% ~ 500%",
-                    "0% ~ 200%",
-                    "0% ~ -50%",
-                    "-50%",
-                    "10 Sec Dumps",
-                ]
-                writer.writerow(headers)
+    # Shared record viewer/exporter
+    def fill_table(self, viewer, cls, records):
+        viewer.setColumnCount(len(cls.HEADERS))
+        viewer.setRowCount(len(records))
+        viewer.setHorizontalHeaderLabels(list(cls.HEADERS))
 
-                for row in range(row_count):
-                    row_data = []
-                    for col in range(column_count):
-                        item = self.ui.wallet_info_viewer.item(row, col)
-                        if item is not None:
-                            row_data.append(item.text())
-                        else:
-                            row_data.append("")
-                    writer.writerow(row_data)
+        for row_index, record in enumerate(records):
+            for col_index, value in enumerate(row(record)):
+                viewer.setItem(row_index, col_index, QTableWidgetItem(str(value)))
+
+        viewer.resizeColumnsToContents()
+
+    def save_records(self, file_path, cls, records):
+        try:
+            to_frame(cls, records).to_csv(file_path, index=False, encoding="utf-8")
 
             QMessageBox.information(
                 self,
@@ -758,6 +723,111 @@ class MainWindow(QMainWindow):
                 self, "Error", f"An error occurred while saving the file:\n{str(e)}"
             )
 
+    # Watch interesting wallets and alert when they enter a pair's top traders
+    def watchlist_notifiers(self):
+        notifiers = [FileNotifier()]
+        if watchlist_webhook_url:
+            notifiers.append(WebhookNotifier(watchlist_webhook_url))
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            self.tray_icon = QSystemTrayIcon(
+                self.style().standardIcon(QStyle.SP_MessageBoxInformation), self
+            )
+            self.tray_icon.show()
+            notifiers.append(DesktopNotifier(self.tray_icon))
+        return notifiers
+
+    def watch_duplicates(self):
+        wallet_addresses = [
+            self.ui.duplicates_viewer.item(row, 0).text()
+            for row in range(self.ui.duplicates_viewer.rowCount())
+        ]
+        self.add_to_watchlist(wallet_addresses, "Interest Wallet Tracker")
+
+    def watch_wallet_info(self):
+        wallet_addresses = [item.wallet_address for item in self.wallet_info_list]
+        self.add_to_watchlist(wallet_addresses, "GMGN Tracker")
+
+    def add_to_watchlist(self, wallet_addresses, note):
+        if not wallet_addresses:
+            QMessageBox.warning(self, "Warning", "No wallets to watch!")
+            return
+
+        self.watchlist.add(wallet_addresses, note)
+        QMessageBox.information(
+            self,
+            "Success",
+            f"Watching {len(wallet_addresses)} wallets ({len(self.watchlist)} in total).",
+        )
+
+    # Worker lifecycle shared by every fetch button: while a run is active its
+    # button cancels it, and a replaced run is disconnected before it finishes.
+    def start_worker(self, name, worker, slot, button, chunk_slot=None):
+        self.retire_worker(name)
+        label = button.text()
+        setattr(self, name, worker)
+        worker.result_signal.connect(slot)
+        if chunk_slot is not None:
+            worker.chunk_signal.connect(chunk_slot)
+        worker.progress_signal.connect(
+            lambda done, total: button.setText(f"Cancel ({done}/{total})")
+        )
+        worker.finished.connect(lambda: button.setText(label))
+        button.setText("Cancel")
+        worker.start()
+
+    def cancel_worker(self, name, button):
+        worker = getattr(self, name)
+        if worker is None or not worker.isRunning():
+            return False
+        worker.cancel()
+        button.setText("Cancelling...")
+        return True
+
+    def retire_worker(self, name):
+        worker = getattr(self, name)
+        if worker is None or not worker.isRunning():
+            return
+        worker.result_signal.disconnect()
+        # Only some workers have a chunk slot connected.
+        with contextlib.suppress(TypeError):
+            worker.chunk_signal.disconnect()
+        worker.progress_signal.disconnect()
+        worker.finished.disconnect()
+        worker.cancel()
+        self.retired_workers.add(worker)
+        worker.finished.connect(lambda: self.retired_workers.discard(worker))
+
+    def record_history(self, dataset, records, fetched_at):
+        self.history_executor.submit(
+            self.run_history_task, self.history.append, dataset, records, fetched_at
+        )
+
+    def run_history_task(self, task, *args):
+        try:
+            task(*args)
+        except Exception as e:
+            print(f"Error writing fetch history: {e}")
+
+    def closeEvent(self, event):
+        workers = [
+            self.project_thread,
+            self.pair_address_thread,
+            self.trader_thread,
+            self.wallet_thread,
+            self.dedup_thread,
+            *self.retired_workers,
+        ]
+        for worker in workers:
+            if worker is not None:
+                worker.cancel()
+        if self.trade_stream_thread is not None:
+            self.trade_stream_thread.stop()
+        for worker in [*workers, self.trade_stream_thread]:
+            if worker is not None:
+                worker.wait()
+        self.history_executor.shutdown()
+        super().closeEvent(event)
+
     # Close app
     def open(self):
         self.open()
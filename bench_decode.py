@@ -0,0 +1,106 @@
+# Compare decode time and peak allocation for the payloads handled in decoding.py.
+#
+#   python bench_decode.py > bench_output.txt
+
+import json
+import time
+import tracemalloc
+
+import decoding
+
+PAIR_COUNT = 2_000
+TRADER_COUNT = 20_000
+REPEAT = 5
+
+
+def pair_payload():
+    # Shaped like a DexScreener token-pairs response: only pairAddress is used.
+    pair = {
+        "chainId": "solana",
+        "dexId": "raydium",
+        "url": "https://dexscreener.com/solana/pair",
+        "baseToken": {"address": "b" * 44, "name": "Token", "symbol": "TKN"},
+        "quoteToken": {"address": "q" * 44, "name": "Wrapped SOL", "symbol": "SOL"},
+        "priceNative": "0.0000123",
+        "priceUsd": "0.00245",
+        "txns": {
+            window: {"buys": 1200, "sells": 980}
+            for window in ("m5", "h1", "h6", "h24")
+        },
+        "volume": {"h24": 1234567.8, "h6": 234567.8, "h1": 34567.8, "m5": 4567.8},
+        "priceChange": {"m5": 1.2, "h1": -3.4, "h6": 5.6, "h24": 78.9},
+        "liquidity": {"usd": 345678.9, "base": 123456789, "quote": 1234.5},
+        "fdv": 2450000,
+        "marketCap": 2450000,
+        "pairCreatedAt": 1727000000000,
+        "info": {"imageUrl": "https://example.com/i.png", "websites": [], "socials": []},
+    }
+    return json.dumps(
+        [dict(pair, pairAddress=f"{index:044d}") for index in range(PAIR_COUNT)]
+    ).encode("utf-8")
+
+
+def bitquery_payload():
+    rows = [
+        {"Trade": {"Account": {"Owner": f"{index:044d}"}}, "pnl": f"{index * 1.5}"}
+        for index in range(TRADER_COUNT)
+    ]
+    return json.dumps({"data": {"Solana": {"DEXTradeByTokens": rows}}}).encode("utf-8")
+
+
+def stdlib_pair_addresses(content):
+    return [item["pairAddress"] for item in json.loads(content)]
+
+
+def stdlib_bitquery_traders(content):
+    rows = json.loads(content)["data"]["Solana"]["DEXTradeByTokens"]
+    return [
+        {"owner": row["Trade"]["Account"]["Owner"], "pnl": float(row["pnl"])}
+        for row in rows
+    ]
+
+
+def measure(function, content):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        function(content)
+    elapsed = (time.perf_counter() - start) / REPEAT
+
+    tracemalloc.start()
+    function(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    backend = (
+        "msgspec"
+        if decoding.msgspec is not None
+        else "orjson" if decoding.orjson is not None else "json"
+    )
+    cases = [
+        ("pair addresses", pair_payload(), stdlib_pair_addresses, decoding.pair_addresses),
+        (
+            "bitquery traders",
+            bitquery_payload(),
+            stdlib_bitquery_traders,
+            decoding.bitquery_traders,
+        ),
+    ]
+
+    print(f"decoding backend: {backend}")
+    for name, content, baseline, candidate in cases:
+        base_time, base_peak = measure(baseline, content)
+        new_time, new_peak = measure(candidate, content)
+        print(
+            f"{name} ({len(content) / 1e6:.1f} MB): "
+            f"json {base_time * 1e3:.1f} ms / {base_peak / 1e6:.1f} MB peak, "
+            f"{backend} {new_time * 1e3:.1f} ms / {new_peak / 1e6:.1f} MB peak "
+            f"({base_time / new_time:.1f}x faster, "
+            f"{base_peak / max(new_peak, 1):.1f}x less memory)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# Decode upstream JSON straight from response bytes, keeping only the fields we use.
+#
+# msgspec decodes into typed schemas and skips every field a schema doesn't
+# declare without building Python objects for it; orjson is the fallback fast
+# decoder, and the stdlib json module is used when neither is installed.
+
+import json
+from typing import Any
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+
+    def loads(content):
+        return orjson.loads(content)
+
+    def dumps(data):
+        return orjson.dumps(data)
+
+else:
+
+    def loads(content):
+        return json.loads(content)
+
+    def dumps(data):
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+if msgspec is not None:
+
+    class PairRef(msgspec.Struct):
+        pairAddress: str
+
+    class BitqueryAccount(msgspec.Struct):
+        Owner: str
+
+    class BitqueryTrade(msgspec.Struct):
+        Account: BitqueryAccount
+
+    class BitqueryRow(msgspec.Struct):
+        Trade: BitqueryTrade
+        pnl: float | str | None = None
+
+    class BitquerySolana(msgspec.Struct):
+        DEXTradeByTokens: list[BitqueryRow]
+
+    class BitqueryData(msgspec.Struct):
+        Solana: BitquerySolana
+
+    class BitqueryResponse(msgspec.Struct):
+        data: BitqueryData
+
+    # Values from the request-URL backend may be null or arrive as strings
+    # like "$1.2M"; the models' from_dict normalizes them the same way for
+    # both decoders, so these schemas only fix the field set.
+    Number = Any
+
+    class TopProjectRow(msgspec.Struct):
+        token_name: str | None = None
+        token_symbol: str | None = None
+        contract_address: str | None = None
+        volume: Number = None
+        created_at: Number = None
+
+    class TopProjectMessage(msgspec.Struct):
+        message: list[TopProjectRow]
+
+    class TopTraderMessage(msgspec.Struct):
+        message: list[str]
+
+    class WalletRow(msgspec.Struct):
+        wallet_address: str | None = None
+        win_rate: Number = None
+        transactions: Number = None
+        pnl: Number = None
+        distribution_num: Number = None
+        distribution: list[Any] | None = None
+        dumps: Number = None
+
+    class WalletMessage(msgspec.Struct):
+        message: list[WalletRow]
+
+    pair_decoder = msgspec.json.Decoder(list[PairRef])
+    bitquery_decoder = msgspec.json.Decoder(BitqueryResponse)
+    top_project_decoder = msgspec.json.Decoder(TopProjectMessage)
+    top_trader_decoder = msgspec.json.Decoder(TopTraderMessage)
+    wallet_decoder = msgspec.json.Decoder(WalletMessage)
+
+
+def top_project_items(content):
+    """Return top project dicts from a get-top-project response."""
+    if msgspec is not None:
+        return [
+            msgspec.structs.asdict(row)
+            for row in top_project_decoder.decode(content).message
+        ]
+    return loads(content)["message"]
+
+
+def top_trader_wallets(content):
+    """Return the ranked wallet addresses from a get-top-trader response."""
+    if msgspec is not None:
+        return top_trader_decoder.decode(content).message
+    return loads(content)["message"]
+
+
+def wallet_items(content):
+    """Return wallet stat dicts from a get-wallet-info response."""
+    if msgspec is not None:
+        return [
+            msgspec.structs.asdict(row) for row in wallet_decoder.decode(content).message
+        ]
+    return loads(content)["message"]
+
+
+def pair_addresses(content):
+    """Return the pair addresses from a DexScreener token-pairs response."""
+    if msgspec is not None:
+        return [pair.pairAddress for pair in pair_decoder.decode(content)]
+    return [item["pairAddress"] for item in loads(content)]
+
+
+def bitquery_traders(content):
+    """Return ``{"owner", "pnl"}`` records from a Bitquery top trader response."""
+    if msgspec is not None:
+        rows = bitquery_decoder.decode(content).data.Solana.DEXTradeByTokens
+        return [
+            {"owner": row.Trade.Account.Owner, "pnl": float(row.pnl or 0)}
+            for row in rows
+        ]
+    rows = loads(content)["data"]["Solana"]["DEXTradeByTokens"]
+    return [
+        {"owner": row["Trade"]["Account"]["Owner"], "pnl": float(row.get("pnl") or 0)}
+        for row in rows
+    ]
@@ -0,0 +1,72 @@
+# Merge top trader exports and keep each wallet's best rank.
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+EXPORT_EXTENSIONS = (".xlsx", ".xls", ".csv")
+MAX_WORKERS = 8
+
+
+def read_export(file_path):
+    """Load one export as Wallet Address / Rank / Source columns."""
+    if file_path.endswith(".csv"):
+        df = pd.read_csv(file_path)
+    else:
+        df = pd.read_excel(file_path)
+
+    if "Wallet Address" not in df.columns:
+        raise ValueError(f"'Wallet Address' column not found in {file_path}.")
+
+    df = df.dropna(subset=["Wallet Address"])
+    frame = pd.DataFrame({"Wallet Address": df["Wallet Address"].astype(str)})
+    if "Rank" in df.columns:
+        frame["Rank"] = pd.to_numeric(df["Rank"], errors="coerce").astype("Int64")
+    else:
+        frame["Rank"] = range(1, len(df) + 1)
+    if "Pair Address" in df.columns:
+        frame["Source"] = df["Pair Address"].astype(str)
+    else:
+        frame["Source"] = os.path.basename(file_path)
+    return frame
+
+
+def best_rank(file_paths):
+    """Read every export in parallel and keep the minimum rank per wallet.
+
+    CSVs are read on threads, since pandas' C parser releases the GIL. Excel
+    files are parsed by openpyxl in pure Python, which holds the GIL, so
+    several of them are read in worker processes instead. Spawned processes
+    are used so forking never copies the Qt app's threads.
+
+    Sorting by (wallet, rank) and keeping the first row of each wallet replaces
+    the old row-order ``keep="first"``, so the surviving row is the best rank
+    across all files, tagged with the file or pair it came from.
+    """
+    excel_paths = [path for path in file_paths if not path.endswith(".csv")]
+    csv_paths = [path for path in file_paths if path.endswith(".csv")]
+    excel_workers = min(MAX_WORKERS, len(excel_paths), os.cpu_count() or 1)
+    frames = {}
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        frames.update(zip(csv_paths, executor.map(read_export, csv_paths)))
+        if excel_workers <= 1:
+            frames.update(zip(excel_paths, map(read_export, excel_paths)))
+
+    if excel_workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=excel_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            frames.update(zip(excel_paths, executor.map(read_export, excel_paths)))
+
+    merged = pd.concat([frames[path] for path in file_paths], ignore_index=True)
+    merged = merged.sort_values(
+        ["Wallet Address", "Rank"], kind="mergesort", na_position="last"
+    )
+    merged = merged.drop_duplicates(subset=["Wallet Address"], keep="first")
+    return merged.sort_values(["Rank", "Wallet Address"], kind="mergesort").reset_index(
+        drop=True
+    )
@@ -0,0 +1,161 @@
+# Rank tokens across the whole volume ranking and only pass on the ones worth a
+# trader lookup.
+#
+# Every token on every page is scored from its volume, its age and how much of
+# its last known trader set is smart money (watchlist wallets). A bounded
+# min-heap keeps the best candidates while paging, and ``select`` returns just
+# the top-k tokens that are new to the top-k or whose score moved since they
+# were last sent downstream.
+
+import os
+import json
+import math
+import time
+import heapq
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+DISCOVERY_FILE = "discovery.json"
+DISCOVERY_TOP_K = int(os.getenv("DISCOVERY_TOP_K") or 30)
+DISCOVERY_MAX_PAGES = int(os.getenv("DISCOVERY_MAX_PAGES") or 10)
+CANDIDATE_LIMIT = 200
+
+VOLUME_WEIGHT = 1.0
+AGE_WEIGHT = 0.5
+OVERLAP_WEIGHT = 2.0
+AGE_HALF_LIFE_HOURS = 24
+CHANGE_THRESHOLD = 0.1
+
+
+def volume_score(volume, rank, top_volume):
+    """Volume on a 0-1 log scale relative to the leader of the ranking.
+
+    Sources that only give the ranking order (the defined.fi page) fall back
+    to the token's position in it.
+    """
+    if math.isnan(volume) or math.isnan(top_volume) or top_volume <= 0:
+        return 1 / (1 + math.log2(rank))
+    return math.log1p(max(volume, 0)) / math.log1p(top_volume)
+
+
+def age_score(created_at, now):
+    """1 for a token created just now, halving every AGE_HALF_LIFE_HOURS."""
+    if math.isnan(created_at):
+        return 0.0
+    hours = max(0.0, now - created_at) / 3600
+    return 0.5 ** (hours / AGE_HALF_LIFE_HOURS)
+
+
+class Discovery:
+    """Scored token candidates plus the state needed to spot changes.
+
+    ``traders`` holds the last trader set seen for each token and ``pushed``
+    the score each top-k token had when it was last sent downstream; both are
+    persisted so a restart does not re-fetch tokens that have not moved.
+    """
+
+    def __init__(
+        self,
+        path=DISCOVERY_FILE,
+        smart_money=(),
+        top_k=DISCOVERY_TOP_K,
+        candidate_limit=CANDIDATE_LIMIT,
+    ):
+        self.path = path
+        self.smart_money = set(smart_money)
+        self.top_k = top_k
+        self.candidate_limit = max(candidate_limit, top_k)
+        self.traders = {}
+        self.pushed = {}
+        self.lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as discovery_file:
+                state = json.load(discovery_file)
+            self.traders = state.get("traders", {})
+            self.pushed = state.get("pushed", {})
+
+    def save(self):
+        with self.lock:
+            state = {"traders": self.traders, "pushed": self.pushed}
+            with open(self.path, "w", encoding="utf-8") as discovery_file:
+                json.dump(state, discovery_file)
+
+    def observe_traders(self, token, wallet_addresses):
+        with self.lock:
+            self.traders[token] = sorted(set(wallet_addresses))
+
+    def overlap(self, token):
+        traders = self.traders.get(token)
+        if not traders or not self.smart_money:
+            return 0.0
+        return len(self.smart_money.intersection(traders)) / len(traders)
+
+    def score(self, token, volume, created_at, rank, top_volume, now):
+        return (
+            VOLUME_WEIGHT * volume_score(volume, rank, top_volume)
+            + AGE_WEIGHT * age_score(created_at, now)
+            + OVERLAP_WEIGHT * self.overlap(token)
+        )
+
+    def rank(self, pages, now=None):
+        """Best candidates from ``pages``, highest score first.
+
+        ``pages`` yields lists of (token, volume, created_at, item) in ranking
+        order. Only ``candidate_limit`` entries are held at once, so the whole
+        ranking can be scanned in constant memory. Returns (score, token, item).
+        """
+        now = now or time.time()
+        heap = []
+        seen = set()
+        top_volume = math.nan
+
+        for page in pages:
+            for token, volume, created_at, item in page:
+                # Rows can shift between pages while the ranking updates.
+                if token in seen:
+                    continue
+                seen.add(token)
+                if len(seen) == 1:
+                    top_volume = volume
+
+                score = self.score(token, volume, created_at, len(seen), top_volume, now)
+                entry = (score, -len(seen), token, item)
+                if len(heap) < self.candidate_limit:
+                    heapq.heappush(heap, entry)
+                else:
+                    heapq.heappushpop(heap, entry)
+
+        return [
+            (score, token, item)
+            for score, _, token, item in sorted(heap, reverse=True)
+        ]
+
+    def is_changed(self, token, score):
+        previous = self.pushed.get(token)
+        if previous is None:
+            return True
+        return abs(score - previous) > CHANGE_THRESHOLD * max(abs(previous), 1e-9)
+
+    def select(self, ranked):
+        """The top-k entries of ``ranked`` that are new or have moved."""
+        return [
+            (score, token, item)
+            for score, token, item in ranked[: self.top_k]
+            if self.is_changed(token, score)
+        ]
+
+    def mark_pushed(self, ranked, pushed):
+        """Remember what went downstream once it is safely handed off.
+
+        Tokens that dropped out of the top-k are forgotten, so they count as
+        changed if they come back.
+        """
+        pushed_scores = {token: score for score, token, _ in pushed}
+        with self.lock:
+            self.pushed = {
+                token: pushed_scores.get(token, self.pushed.get(token, score))
+                for score, token, _ in ranked[: self.top_k]
+            }
+        self.save()
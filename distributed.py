@@ -0,0 +1,347 @@
+# Shard large wallet/pair batches across worker processes.
+#
+# A coordinator splits the input list into shards in a SQLite job queue; any
+# number of worker processes on the same machine lease shards, fetch them and
+# write the results back. The database must sit on a local disk: SQLite's WAL
+# mode does not work over network filesystems, so this does not span machines.
+# Each of N workers gets 1/N of every provider's rate limit (pass --workers N
+# when starting them by hand), so together they stay within one budget.
+#
+#   python distributed.py submit wallets.txt --kind wallet
+#   python distributed.py worker --workers 2
+#   python distributed.py collect 1 --output wallet_info.csv
+#   python distributed.py run pairs.txt --kind pair --processes 4 --output top_traders.csv
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import argparse
+from dataclasses import astuple
+from multiprocessing import Process
+
+import fetchers
+import rate_limit
+from models import TopTrader, WalletStats, to_frame
+
+JOB_DB = "jobs.db"
+LEASE_SECONDS = 300
+IDLE_SECONDS = 2
+RETRY_SECONDS = 5
+MAX_ATTEMPTS = 5
+
+# kind -> (record class, shard size, fetch(shard) -> records, result key)
+JOB_KINDS = {
+    "wallet": (
+        WalletStats,
+        50,
+        fetchers.fetch_wallet_stats,
+        lambda record: record.wallet_address,
+    ),
+    "pair": (
+        TopTrader,
+        1,
+        lambda shard: [
+            record
+            for pair_address in shard
+            for record in fetchers.fetch_top_traders(pair_address)
+        ],
+        lambda record: f"{record.pair_address}:{record.wallet_address}",
+    ),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shards (
+    job_id INTEGER NOT NULL,
+    shard_id INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, shard_id)
+);
+CREATE INDEX IF NOT EXISTS shards_status ON shards (status, lease_until);
+CREATE TABLE IF NOT EXISTS results (
+    job_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    shard_id INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (job_id, key)
+);
+"""
+
+
+def connect(db_path):
+    connection = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(SCHEMA)
+    # Databases from before results were tracked per shard.
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(results)")]
+    if "shard_id" not in columns:
+        connection.execute(
+            "ALTER TABLE results ADD COLUMN shard_id INTEGER NOT NULL DEFAULT -1"
+        )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS results_shard ON results (job_id, shard_id)"
+    )
+    return connection
+
+
+def submit(db_path, kind, items):
+    """Queue ``items`` as a new job and return its id."""
+    _, shard_size, _, _ = JOB_KINDS[kind]
+    connection = connect(db_path)
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        job_id = connection.execute(
+            "INSERT INTO jobs (kind, created) VALUES (?, ?)", (kind, time.time())
+        ).lastrowid
+        connection.executemany(
+            "INSERT INTO shards (job_id, shard_id, payload) VALUES (?, ?, ?)",
+            [
+                (job_id, shard_id, json.dumps(items[index : index + shard_size]))
+                for shard_id, index in enumerate(range(0, len(items), shard_size))
+            ],
+        )
+        connection.execute("COMMIT")
+        return job_id
+    finally:
+        connection.close()
+
+
+def claim(connection, worker_name):
+    """Lease the next pending (or expired) shard; None when nothing is ready."""
+    now = time.time()
+    connection.execute("BEGIN IMMEDIATE")
+    # Expired leases that already used every attempt will never be retried.
+    connection.execute(
+        "UPDATE shards SET status = 'failed', lease_until = NULL "
+        "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+        (now, MAX_ATTEMPTS),
+    )
+    row = connection.execute(
+        """
+        SELECT shards.job_id, shards.shard_id, shards.payload, jobs.kind
+        FROM shards JOIN jobs ON jobs.id = shards.job_id
+        WHERE shards.attempts < ?
+          AND (shards.status = 'pending'
+               OR (shards.status = 'leased' AND shards.lease_until < ?))
+        ORDER BY shards.job_id, shards.shard_id
+        LIMIT 1
+        """,
+        (MAX_ATTEMPTS, now),
+    ).fetchone()
+    if row is None:
+        connection.execute("COMMIT")
+        return None
+
+    job_id, shard_id, payload, kind = row
+    connection.execute(
+        """
+        UPDATE shards SET status = 'leased', worker = ?, lease_until = ?,
+                          attempts = attempts + 1
+        WHERE job_id = ? AND shard_id = ?
+        """,
+        (worker_name, now + LEASE_SECONDS, job_id, shard_id),
+    )
+    connection.execute("COMMIT")
+    return job_id, shard_id, json.loads(payload), kind
+
+
+def complete(connection, job_id, shard_id, kind, records):
+    # A shard redone after an expired lease replaces all of its earlier rows,
+    # so wallets that dropped out of the result don't linger as stale rows.
+    _, _, _, result_key = JOB_KINDS[kind]
+    connection.execute("BEGIN IMMEDIATE")
+    connection.execute(
+        "DELETE FROM results WHERE job_id = ? AND shard_id = ?", (job_id, shard_id)
+    )
+    connection.executemany(
+        "INSERT OR REPLACE INTO results (job_id, key, shard_id, value) "
+        "VALUES (?, ?, ?, ?)",
+        [
+            (job_id, result_key(record), shard_id, json.dumps(astuple(record)))
+            for record in records
+        ],
+    )
+    connection.execute(
+        "UPDATE shards SET status = 'done', lease_until = NULL "
+        "WHERE job_id = ? AND shard_id = ?",
+        (job_id, shard_id),
+    )
+    connection.execute("COMMIT")
+
+
+def fail(connection, job_id, shard_id):
+    """Retry a failed shard after a backoff, or mark it failed for good."""
+    connection.execute(
+        """
+        UPDATE shards
+        SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'leased' END,
+            lease_until = CASE WHEN attempts >= ? THEN NULL
+                               ELSE ? + attempts * ? END
+        WHERE job_id = ? AND shard_id = ?
+        """,
+        (MAX_ATTEMPTS, MAX_ATTEMPTS, time.time(), RETRY_SECONDS, job_id, shard_id),
+    )
+
+
+def unfinished(connection):
+    (count,) = connection.execute(
+        "SELECT COUNT(*) FROM shards WHERE status IN ('pending', 'leased')"
+    ).fetchone()
+    return count
+
+
+def work(db_path, exit_when_idle=True, workers=1):
+    """Pull and process shards until none are pending or leased.
+
+    ``workers`` is how many workers run at once; this one paces its requests
+    to its share of each provider's budget.
+    """
+    rate_limit.split_budget(workers)
+    worker_name = f"{socket.gethostname()}:{os.getpid()}"
+    connection = connect(db_path)
+    try:
+        while True:
+            shard = claim(connection, worker_name)
+            if shard is None:
+                # Leased shards may still come back for a retry, so only
+                # leave once every shard is done or has failed for good.
+                if exit_when_idle and not unfinished(connection):
+                    return
+                time.sleep(IDLE_SECONDS)
+                continue
+
+            job_id, shard_id, items, kind = shard
+            _, _, fetch, _ = JOB_KINDS[kind]
+            try:
+                records = fetch(items)
+            except Exception as e:
+                print(f"Error processing shard {job_id}/{shard_id}: {e}")
+                fail(connection, job_id, shard_id)
+                continue
+            complete(connection, job_id, shard_id, kind, records)
+    finally:
+        connection.close()
+
+
+def status(db_path, job_id):
+    connection = connect(db_path)
+    try:
+        return dict(
+            connection.execute(
+                "SELECT status, COUNT(*) FROM shards WHERE job_id = ? GROUP BY status",
+                (job_id,),
+            ).fetchall()
+        )
+    finally:
+        connection.close()
+
+
+def collect(db_path, job_id, allow_partial=False):
+    """Merged records for a job, in key order.
+
+    Raises ``RuntimeError`` while any shard is not done, unless
+    ``allow_partial`` is set.
+    """
+    shard_status = status(db_path, job_id)
+    if set(shard_status) - {"done"}:
+        if not allow_partial:
+            raise RuntimeError(f"Job {job_id} is incomplete: {shard_status}")
+        print(f"Warning: job {job_id} is incomplete: {shard_status}")
+
+    connection = connect(db_path)
+    try:
+        (kind,) = connection.execute(
+            "SELECT kind FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        cls, _, _, _ = JOB_KINDS[kind]
+        rows = connection.execute(
+            "SELECT value FROM results WHERE job_id = ? ORDER BY key", (job_id,)
+        )
+        return cls, [cls(*json.loads(value)) for (value,) in rows]
+    finally:
+        connection.close()
+
+
+def run_local(db_path, kind, items, processes):
+    job_id = submit(db_path, kind, items)
+    workers = [
+        Process(target=work, args=(db_path, True, processes)) for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return job_id
+
+
+def read_items(file_path):
+    with open(file_path, "r", encoding="utf-8") as item_file:
+        return [line.strip() for line in item_file if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default=JOB_DB)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = commands.add_parser("submit")
+    submit_parser.add_argument("input_file")
+    submit_parser.add_argument("--kind", choices=JOB_KINDS, required=True)
+
+    worker_parser = commands.add_parser("worker")
+    worker_parser.add_argument("--forever", action="store_true")
+    worker_parser.add_argument(
+        "--workers", type=int, default=1, help="workers sharing the rate limits"
+    )
+
+    status_parser = commands.add_parser("status")
+    status_parser.add_argument("job_id", type=int)
+
+    collect_parser = commands.add_parser("collect")
+    collect_parser.add_argument("job_id", type=int)
+    collect_parser.add_argument("--output", required=True)
+    collect_parser.add_argument("--partial", action="store_true")
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("input_file")
+    run_parser.add_argument("--kind", choices=JOB_KINDS, required=True)
+    run_parser.add_argument("--processes", type=int, default=4)
+    run_parser.add_argument("--output", required=True)
+    run_parser.add_argument("--partial", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.command == "submit":
+        print(submit(args.db, args.kind, read_items(args.input_file)))
+    elif args.command == "worker":
+        work(args.db, exit_when_idle=not args.forever, workers=args.workers)
+    elif args.command == "status":
+        print(status(args.db, args.job_id))
+    else:
+        if args.command == "run":
+            job_id = run_local(
+                args.db, args.kind, read_items(args.input_file), args.processes
+            )
+        else:
+            job_id = args.job_id
+        try:
+            cls, records = collect(args.db, job_id, args.partial)
+        except RuntimeError as e:
+            print(f"{e}; pass --partial to save the finished shards anyway")
+            raise SystemExit(1)
+        to_frame(cls, records).to_csv(args.output, index=False, encoding="utf-8")
+        print(f"Saved {len(records)} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
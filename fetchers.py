@@ -0,0 +1,166 @@
+# Upstream fetches shared by the GUI threads and the headless distributed workers.
+
+import os
+import json
+import requests
+from dotenv import load_dotenv
+
+from rate_limit import governed_request
+from decoding import (
+    top_project_items,
+    top_trader_wallets,
+    wallet_items,
+    pair_addresses,
+)
+from models import TopProject, Pair, TopTrader, WalletStats
+
+load_dotenv()
+dexscreener_request_url = os.getenv("DEXSCREENER_REQUEST_URL")
+gmgn_request_url = os.getenv("GMGN_REQUEST_URL")
+
+REQUEST_TIMEOUT = 30
+
+# Every fetch also takes ``should_stop`` and a monotonic ``deadline``, handed
+# to governed_request so a cancelled run stops waiting on throttled upstreams.
+
+
+def get_top_project(timeout=REQUEST_TIMEOUT, page=1, should_stop=None, deadline=None):
+    url = f"{dexscreener_request_url}/get-top-project"
+    params = {"page": page} if page > 1 else None
+    try:
+        response = governed_request(
+            "dexscreener",
+            "GET",
+            url,
+            should_stop,
+            deadline,
+            params=params,
+            timeout=timeout,
+        )
+        if response.status_code == 200:
+            return [
+                TopProject.from_dict(item) for item in top_project_items(response.content)
+            ]
+        print(f"Failed to retrieve data. Status code: {response.status_code}")
+        return []
+    except requests.exceptions.RequestException as e:
+        print(f"HTTP Request failed: {e}")
+        return []
+
+
+def top_project_pages(request_timeout, should_stop, max_pages, deadline=None):
+    """Page through the full volume ranking until it runs out.
+
+    Stops early on an empty page or one listing the same tokens as the
+    previous page, which is what a server that ignores ``page`` sends back
+    (volumes move between calls, so only the contract addresses are compared).
+    """
+    previous = None
+    for page in range(1, max_pages + 1):
+        if should_stop():
+            return
+        top_projects = get_top_project(
+            request_timeout(), page, should_stop, deadline
+        )
+        tokens = [project.contract_address for project in top_projects]
+        if not tokens or tokens == previous:
+            return
+        yield top_projects
+        previous = tokens
+
+
+def pair_address_from_CA(
+    contract_address, timeout=REQUEST_TIMEOUT, should_stop=None, deadline=None
+):
+    response = governed_request(
+        "dexscreener",
+        "GET",
+        f"https://api.dexscreener.com/token-pairs/v1/solana/{contract_address}",
+        should_stop,
+        deadline,
+        headers={},
+        timeout=timeout,
+    )
+    return [
+        Pair(pair_address, contract_address)
+        for pair_address in pair_addresses(response.content)
+    ]
+
+
+def ensure_ok(response):
+    if response.status_code != 200:
+        raise requests.exceptions.HTTPError(
+            f"Failed to retrieve data. Status code: {response.status_code}",
+            response=response,
+        )
+    return response
+
+
+def fetch_top_traders(
+    pair_address, timeout=REQUEST_TIMEOUT, should_stop=None, deadline=None
+):
+    """Top traders for one pair; raises on transport errors and non-200s."""
+    # One pair per request so every wallet keeps its pair and its real rank.
+    # The backend returns one flat wallet list per batch with no pair
+    # boundaries, so this costs N requests for N pairs where the old batched
+    # call cost one; TraderThread runs them TRADER_CONCURRENCY at a time.
+    url = f"{dexscreener_request_url}/get-top-trader"
+    headers = {"Content-Type": "application/json"}
+    data = {"pair_address_list": [pair_address]}
+    response = governed_request(
+        "dexscreener",
+        "GET",
+        url,
+        should_stop,
+        deadline,
+        headers=headers,
+        data=json.dumps(data),
+        timeout=timeout,
+    )
+    return [
+        TopTrader(pair_address, wallet_address, rank)
+        for rank, wallet_address in enumerate(
+            top_trader_wallets(ensure_ok(response).content), start=1
+        )
+    ]
+
+
+def fetch_wallet_stats(
+    wallet_address_list, timeout=REQUEST_TIMEOUT, should_stop=None, deadline=None
+):
+    """GMGN stats for a batch of wallets; raises on transport errors and non-200s."""
+    url = f"{gmgn_request_url}/get-wallet-info"
+    headers = {"Content-Type": "application/json"}
+    data = {"wallet_address_list": wallet_address_list}
+    response = governed_request(
+        "gmgn",
+        "GET",
+        url,
+        should_stop,
+        deadline,
+        headers=headers,
+        data=json.dumps(data),
+        timeout=timeout,
+    )
+    return [
+        WalletStats.from_dict(item)
+        for item in wallet_items(ensure_ok(response).content)
+    ]
+
+
+def top_traders_for_pair(
+    pair_address, timeout=REQUEST_TIMEOUT, should_stop=None, deadline=None
+):
+    try:
+        return fetch_top_traders(pair_address, timeout, should_stop, deadline)
+    except requests.exceptions.RequestException as e:
+        print(f"HTTP Request failed: {e}")
+        return []
+
+
+def gmgn(wallet_address_list, timeout=REQUEST_TIMEOUT, should_stop=None, deadline=None):
+    try:
+        return fetch_wallet_stats(wallet_address_list, timeout, should_stop, deadline)
+    except requests.exceptions.RequestException as e:
+        print(f"HTTP Request failed: {e}")
+        return []
@@ -0,0 +1,220 @@
+# Day-partitioned Parquet history of every fetch, queried through DuckDB.
+#
+#   history/<dataset>/day=YYYY-MM-DD/part-*.parquet
+#
+#   python history_store.py wallet <wallet_address>
+#   python history_store.py stayed <pair_address> --days 7
+#   python history_store.py maintain
+
+import os
+import json
+import time
+import shutil
+import argparse
+from dataclasses import fields
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from models import TopProject, TopTrader, WalletStats, to_columns
+
+load_dotenv()
+HISTORY_DIR = os.getenv("HISTORY_DIR") or "history"
+RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS") or 90)
+
+DATASETS = {
+    "projects": TopProject,
+    "top_traders": TopTrader,
+    "wallets": WalletStats,
+}
+COMPACTED_FILE = "compacted.parquet"
+TEMP_FILE = f".{COMPACTED_FILE}.tmp"
+MANIFEST_FILE = ".compacting.json"
+
+
+def today():
+    return datetime.now(timezone.utc).date()
+
+
+class HistoryStore:
+    """Append-only snapshots, one small Parquet file per fetch.
+
+    ``compact`` folds a finished day's files into one, and ``apply_retention``
+    drops whole day partitions past the retention window, so disk use is
+    bounded by (days kept) x (one file per dataset per day).
+    """
+
+    def __init__(self, root=HISTORY_DIR, retention_days=RETENTION_DAYS):
+        self.root = root
+        self.retention_days = retention_days
+
+    def partition(self, dataset, day):
+        return os.path.join(self.root, dataset, f"day={day.isoformat()}")
+
+    def days(self, dataset):
+        dataset_dir = os.path.join(self.root, dataset)
+        if not os.path.isdir(dataset_dir):
+            return []
+        return sorted(
+            datetime.strptime(name[len("day=") :], "%Y-%m-%d").date()
+            for name in os.listdir(dataset_dir)
+            if name.startswith("day=")
+        )
+
+    def append(self, dataset, records, captured_at=None):
+        if not records:
+            return
+        cls = DATASETS[dataset]
+        captured_at = captured_at or time.time()
+        frame = pd.DataFrame(to_columns(cls, records))
+        frame["captured_at"] = pd.Timestamp(captured_at, unit="s", tz="UTC")
+
+        day = frame["captured_at"].iloc[0].date()
+        partition = self.partition(dataset, day)
+        os.makedirs(partition, exist_ok=True)
+        file_name = f"part-{time.time_ns()}-{os.getpid()}.parquet"
+        frame.to_parquet(os.path.join(partition, file_name), index=False)
+
+    def recover(self, partition):
+        """Finish or roll back a compaction that a crash interrupted."""
+        temp_path = os.path.join(partition, TEMP_FILE)
+        manifest_path = os.path.join(partition, MANIFEST_FILE)
+        if os.path.exists(temp_path):
+            # The swap never happened, so the part files are still the data.
+            os.remove(temp_path)
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+        elif os.path.exists(manifest_path):
+            # The swap happened; drop the parts the compacted file replaced.
+            with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+                for name in json.load(manifest_file):
+                    if os.path.exists(os.path.join(partition, name)):
+                        os.remove(os.path.join(partition, name))
+            os.remove(manifest_path)
+
+    def recover_all(self):
+        for dataset in DATASETS:
+            for day in self.days(dataset):
+                self.recover(self.partition(dataset, day))
+
+    def compact(self, dataset, day):
+        partition = self.partition(dataset, day)
+        self.recover(partition)
+        parts = sorted(
+            name for name in os.listdir(partition) if name.endswith(".parquet")
+        )
+        if len(parts) <= 1:
+            return
+
+        frame = pd.concat(
+            [pd.read_parquet(os.path.join(partition, name)) for name in parts],
+            ignore_index=True,
+        )
+        frame = frame.sort_values("captured_at", kind="stable")
+
+        # Write a hidden temp file (never matched by *.parquet), list the parts
+        # it replaces, swap it in, then delete those parts. A crash at any
+        # step is undone or finished by recover(), so a day is never lost.
+        temp_path = os.path.join(partition, TEMP_FILE)
+        manifest_path = os.path.join(partition, MANIFEST_FILE)
+        frame.to_parquet(temp_path, index=False)
+        with open(manifest_path, "w", encoding="utf-8") as manifest_file:
+            json.dump([name for name in parts if name != COMPACTED_FILE], manifest_file)
+        os.replace(temp_path, os.path.join(partition, COMPACTED_FILE))
+        self.recover(partition)
+
+    def apply_retention(self, dataset):
+        cutoff = today() - timedelta(days=self.retention_days)
+        for day in self.days(dataset):
+            if day < cutoff:
+                shutil.rmtree(self.partition(dataset, day))
+
+    def maintain(self):
+        """Compact every finished day and drop partitions past retention."""
+        for dataset in DATASETS:
+            self.apply_retention(dataset)
+            for day in self.days(dataset):
+                if day < today():
+                    self.compact(dataset, day)
+
+    def connect(self):
+        import duckdb
+
+        self.recover_all()
+        connection = duckdb.connect()
+        for dataset in DATASETS:
+            if self.days(dataset):
+                pattern = os.path.join(self.root, dataset, "*", "*.parquet")
+                connection.execute(
+                    f"CREATE VIEW {dataset} AS SELECT * FROM "
+                    f"read_parquet('{pattern}', hive_partitioning = true, "
+                    "union_by_name = true)"
+                )
+        return connection
+
+    def query(self, sql, parameters=()):
+        connection = self.connect()
+        try:
+            return connection.execute(sql, list(parameters)).df()
+        finally:
+            connection.close()
+
+    def wallet_history(self, wallet_address):
+        """How a wallet's win rate and PnL evolved across GMGN snapshots."""
+        columns = ", ".join(field.name for field in fields(WalletStats))
+        return self.query(
+            f"SELECT captured_at, {columns} FROM wallets "
+            "WHERE wallet_address = ? ORDER BY captured_at",
+            [wallet_address],
+        )
+
+    def stayed_in_top(self, pair_address, days=7):
+        """Wallets present in the pair's top traders on every recorded day."""
+        since = today() - timedelta(days=days - 1)
+        return self.query(
+            """
+            WITH snapshots AS (
+                SELECT * FROM top_traders
+                WHERE pair_address = ? AND day >= ?
+            )
+            SELECT wallet_address,
+                   COUNT(DISTINCT day) AS days,
+                   MIN(rank) AS best_rank,
+                   AVG(rank) AS average_rank
+            FROM snapshots
+            GROUP BY wallet_address
+            HAVING COUNT(DISTINCT day) = (SELECT COUNT(DISTINCT day) FROM snapshots)
+            ORDER BY best_rank, average_rank
+            """,
+            [pair_address, since],
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the fetch history.")
+    parser.add_argument("--root", default=HISTORY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    wallet_parser = commands.add_parser("wallet")
+    wallet_parser.add_argument("wallet_address")
+
+    stayed_parser = commands.add_parser("stayed")
+    stayed_parser.add_argument("pair_address")
+    stayed_parser.add_argument("--days", type=int, default=7)
+
+    commands.add_parser("maintain")
+
+    args = parser.parse_args()
+    store = HistoryStore(args.root)
+
+    if args.command == "wallet":
+        print(store.wallet_history(args.wallet_address).to_string(index=False))
+    elif args.command == "stayed":
+        print(store.stayed_in_top(args.pair_address, args.days).to_string(index=False))
+    else:
+        store.maintain()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# Compact record types for the data that moves between threads, viewers and exporters.
+
+import math
+from datetime import datetime
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+SUFFIXES = {"K": 1e3, "M": 1e6, "B": 1e9}
+
+
+def number(value):
+    """Parse API numbers that may arrive as "$1.2M", "45%", "1,234" or None.
+
+    Anything that still isn't a number becomes NaN, so one odd value never
+    fails the batch it arrived in.
+    """
+    if value is None or value == "":
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().replace("$", "").replace(",", "").rstrip("%")
+    scale = SUFFIXES.get(text[-1:].upper())
+    if scale is not None:
+        text = text[:-1]
+    try:
+        return float(text) * (scale or 1)
+    except ValueError:
+        return math.nan
+
+
+def text(value):
+    """String field value, with a missing one as ""."""
+    return "" if value is None else str(value)
+
+
+def timestamp(value):
+    """Epoch seconds from seconds, milliseconds or an ISO-8601 string.
+
+    Missing or unparseable values (e.g. "3 days ago") become NaN, like number().
+    """
+    if value is None or value == "":
+        return math.nan
+    try:
+        if isinstance(value, str) and not value.replace(".", "", 1).isdigit():
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return seconds / 1000 if seconds > 1e11 else seconds
+
+
+@dataclass(slots=True)
+class TopProject:
+    token_name: str
+    token_symbol: str
+    contract_address: str
+    volume: float
+    created_at: float = math.nan
+
+    HEADERS = ("Name", "Symbol", "Contract Address", "Volume", "Created At")
+
+    @classmethod
+    def from_dict(cls, item):
+        return cls(
+            text(item.get("token_name")),
+            text(item.get("token_symbol")),
+            text(item.get("contract_address")),
+            number(item.get("volume")),
+            timestamp(item.get("created_at")),
+        )
+
+
+@dataclass(slots=True)
+class Pair:
+    pair_address: str
+    contract_address: str = ""
+
+    HEADERS = ("Pair_Address", "Contract Address")
+
+
+@dataclass(slots=True)
+class TopTrader:
+    pair_address: str
+    wallet_address: str
+    rank: int
+    volume: float = math.nan
+    pnl: float = math.nan
+    trades: float = math.nan
+
+    HEADERS = ("Pair Address", "Wallet Address", "Rank", "Volume", "PnL", "Trades")
+
+
+# Counts are floats so a missing or malformed GMGN value can be NaN.
+@dataclass(slots=True)
+class WalletStats:
+    wallet_address: str
+    win_rate: float
+    transactions: float
+    pnl: float
+    distribution_num: float
+    above_500: float
+    from_200_to_500: float
+    from_0_to_200: float
+    from_0_to_minus_50: float
+    below_minus_50: float
+    dumps: float
+
+    HEADERS = (
+        "Wallet Address",
+        "Win Rate",
+        "Transactions",
+        "PnL",
+        "Distribution",
+        "500%",
+        "200% ~ 500%",
+        "0% ~ 200%",
+        "0% ~ -50%",
+        "-50%",
+        "10 Sec Dumps",
+    )
+
+    @classmethod
+    def from_dict(cls, item):
+        distribution = [number(value) for value in (item.get("distribution") or [])[:5]]
+        distribution += [math.nan] * (5 - len(distribution))
+        return cls(
+            text(item.get("wallet_address")),
+            number(item.get("win_rate")),
+            number(item.get("transactions")),
+            number(item.get("pnl")),
+            number(item.get("distribution_num")),
+            *distribution,
+            number(item.get("dumps")),
+        )
+
+
+def row(record):
+    """Field values of a record in ``HEADERS`` order."""
+    return [getattr(record, field.name) for field in fields(record)]
+
+
+def column_dtype(annotation):
+    return {float: np.float64, int: np.int64}.get(annotation, object)
+
+
+def to_columns(cls, records):
+    """Turn records into one NumPy array per field (object arrays for strings)."""
+    return {
+        field.name: np.fromiter(
+            (getattr(record, field.name) for record in records),
+            dtype=column_dtype(field.type),
+            count=len(records),
+        )
+        for field in fields(cls)
+    }
+
+
+def from_columns(cls, columns):
+    names = [field.name for field in fields(cls)]
+    values = [columns[name].tolist() for name in names]
+    return [cls(*row_values) for row_values in zip(*values)]
+
+
+def to_frame(cls, records):
+    """DataFrame with the record's display headers, ready for CSV/Excel export."""
+    frame = pd.DataFrame(to_columns(cls, records))
+    frame.columns = list(cls.HEADERS)
+    return frame
+
+
+def from_frame(cls, frame):
+    columns = {
+        field.name: frame[header].to_numpy()
+        for field, header in zip(fields(cls), cls.HEADERS)
+    }
+    return from_columns(cls, columns)
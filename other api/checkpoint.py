@@ -0,0 +1,92 @@
+# Append-only journal so the export scripts can resume after a crash.
+
+import os
+import json
+
+
+class Journal:
+    """Record finished work as JSON lines and replay it on restart.
+
+    Entries are one of:
+        {"kind": "projects", "items": [...]}
+        {"kind": "page", "token": ..., "offset": ..., "items": [...]}
+        {"kind": "token", "token": ...}
+    Every entry is flushed and fsynced before the call returns, so anything
+    in the journal is safe to skip on the next run. Only the byte position of
+    each page is kept in memory; its items are read back from disk on demand.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.projects = None
+        self.pages = {}
+        self.done_tokens = set()
+
+        if os.path.exists(path):
+            self.load()
+        self.file = open(path, "ab")
+        self.reader = open(path, "rb")
+
+    def load(self):
+        end = 0
+        with open(self.path, "rb") as journal_file:
+            for line in iter(journal_file.readline, b""):
+                if not line.endswith(b"\n"):
+                    break
+                self.apply(json.loads(line), end)
+                end = journal_file.tell()
+
+        # A crash mid-write leaves a torn last line; drop it so that page is redone.
+        if end < os.path.getsize(self.path):
+            os.truncate(self.path, end)
+
+    def apply(self, entry, position):
+        if entry["kind"] == "projects":
+            self.projects = entry["items"]
+        elif entry["kind"] == "page":
+            self.pages[(entry["token"], entry["offset"])] = position
+        elif entry["kind"] == "token":
+            self.done_tokens.add(entry["token"])
+
+    def record(self, entry):
+        position = self.file.seek(0, os.SEEK_END)
+        self.file.write(json.dumps(entry).encode("utf-8") + b"\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.apply(entry, position)
+
+    def save_projects(self, items):
+        self.record({"kind": "projects", "items": items})
+
+    def has_page(self, token, offset):
+        return (token, offset) in self.pages
+
+    def save_page(self, token, offset, items):
+        self.record({"kind": "page", "token": token, "offset": offset, "items": items})
+
+    def is_token_done(self, token):
+        return token in self.done_tokens
+
+    def mark_token_done(self, token):
+        self.record({"kind": "token", "token": token})
+
+    def token_items(self, token):
+        offsets = sorted(offset for key, offset in self.pages if key == token)
+        for offset in offsets:
+            self.reader.seek(self.pages[(token, offset)])
+            yield from json.loads(self.reader.readline())["items"]
+
+    def all_done(self, tokens):
+        return all(token in self.done_tokens for token in tokens)
+
+    def close(self):
+        self.file.close()
+        self.reader.close()
+
+    def archive(self):
+        """Close and move the journal aside so the next run starts fresh.
+
+        The last finished journal is kept as ``<path>.done`` for inspection.
+        """
+        self.close()
+        os.replace(self.path, f"{self.path}.done")
@@ -1,15 +1,22 @@
-# Get top 30 projects from https://www.defined.fi/ and then fetch top 100 traders from BirdEye API, then export excel file from the result.
+# Rank tokens across the https://www.defined.fi/ discover list, fetch top 100 traders from BirdEye API for the top ones that changed since the last run, then export excel file from the result.
 
 import contextlib
 import os
+import sys
 import json
-import requests
+import math
 from time import sleep
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from openpyxl import Workbook, load_workbook
+from openpyxl import Workbook
+from checkpoint import Journal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rate_limit import governed_request
+from discovery import Discovery
+from watchlist import Watchlist
 
 # Load environment variables
 load_dotenv()
@@ -23,6 +30,8 @@ URL_TEMPLATE = (
     "&sort_by=volume&offset={offset}&limit=10"
 )
 EXCEL_FILE = "output.xlsx"
+JOURNAL_FILE = "checkpoint.jsonl"
+DISCOVERY_MAX_ROWS = 300
 BASE_URL = "https://www.defined.fi/"
 TOKENS_URL = (
     f"{BASE_URL}tokens/discover?createdAt=week1&rankingBy=volume"
@@ -45,16 +54,6 @@ def find_elements(driver, by, value):
         sleep(0.1)
 
 
-def set_excel():
-    wb = Workbook()
-    sheet = wb.active
-    sheet.title = "Top Projects"
-    headers = ["Token Name", "Contract Address", "Pair Address"]
-    for column, header in enumerate(headers, start=1):
-        sheet.cell(row=1, column=column).value = header
-    return wb, sheet
-
-
 def fetch_token_data(item):
     return {
         "token_name": item.find_element(By.CLASS_NAME, "css-i26l22").text,
@@ -76,20 +75,42 @@ def fetch_token_data(item):
     }
 
 
-def get_contract_addresses(driver, wb, sheet):
+def load_token_rows(driver):
+    # The discover list loads more rows as it is scrolled; keep scrolling until
+    # it stops growing or DISCOVERY_MAX_ROWS rows are on the page.
+    token_rows = []
+    while True:
+        rows = find_elements(
+            driver, By.CSS_SELECTOR, "div[data-sentry-component='TokenRow']"
+        )
+        if len(rows) <= len(token_rows) or len(rows) >= DISCOVERY_MAX_ROWS:
+            return rows[:DISCOVERY_MAX_ROWS]
+        token_rows = rows
+        driver.execute_script("arguments[0].scrollIntoView();", rows[-1])
+        sleep(1)
+
+
+def get_contract_addresses(driver, discovery):
     output_contract_addresses = []
-    start_row = 2
+    ranked, selected = [], []
 
     try:
         driver.get(TOKENS_URL)
-        token_rows = find_elements(
-            driver, By.CSS_SELECTOR, "div[data-sentry-component='TokenRow']"
-        )
-
-        for i, item in enumerate(token_rows[:30], start=1):
-            print(f"----------- {i} -----------")
-            data = fetch_token_data(item)
-            output_contract_addresses.append(data)
+        candidates = []
+        for item in load_token_rows(driver):
+            with contextlib.suppress(Exception):
+                data = fetch_token_data(item)
+                candidates.append((data["contract_address"], math.nan, math.nan, data))
+
+        ranked = discovery.rank([candidates])
+        selected = discovery.select(ranked)
+        changed = {token for _, token, _ in selected}
+        print(f"{len(selected)} of the top {discovery.top_k} tokens changed")
+
+        for i, (score, token, data) in enumerate(ranked[: discovery.top_k], start=1):
+            mark = " changed" if token in changed else ""
+            print(f"----------- {i} ({score:.3f}){mark} -----------")
+            output_contract_addresses.append(dict(data, changed=token in changed))
 
             print(
                 " / ".join(
@@ -103,14 +124,6 @@ def get_contract_addresses(driver, wb, sheet):
                 )
             )
 
-            for col, key in enumerate(
-                ["token_name", "contract_address", "pair_address"], start=1
-            ):
-                sheet.cell(row=start_row, column=col).value = data[key]
-            start_row += 1
-
-        wb.save(EXCEL_FILE)
-
     except Exception as e:
         print(f"An error occurred: {e}")
 
@@ -120,10 +133,31 @@ def get_contract_addresses(driver, wb, sheet):
     with open("contract_address_list.json", "w", encoding="utf-8") as data_file:
         json.dump(output_contract_addresses, data_file, indent=4)
 
-    return output_contract_addresses
+    return ranked, selected, output_contract_addresses
+
+
+def previous_traders_file(item):
+    # Keyed by contract, not name: memecoins often share a token name.
+    return f"./top_trader/{item['contract_address']}.json"
+
 
+def needs_fetch(item):
+    """Changed tokens, and unchanged ones with no earlier result to reuse."""
+    return item.get("changed", True) or not os.path.exists(previous_traders_file(item))
 
-def get_top_trader_address(contract_addresses):
+
+def token_traders(item, journal):
+    """This run's traders for the token, else the ones saved by an earlier run."""
+    token = item["contract_address"]
+    if journal.is_token_done(token):
+        return list(journal.token_items(token))
+    if os.path.exists(previous_traders_file(item)):
+        with open(previous_traders_file(item), "r") as wallet_data:
+            return json.load(wallet_data)
+    return []
+
+
+def get_top_trader_address(contract_addresses, journal):
     headers = {
         "accept": "application/json",
         "x-chain": "solana",
@@ -132,43 +166,79 @@ def get_top_trader_address(contract_addresses):
     os.makedirs("./top_trader", exist_ok=True)
 
     for item in contract_addresses:
-        wallet_address_list = []
+        token = item["contract_address"]
+        if journal.is_token_done(token):
+            print(f"Skipping {item['token_name']}: already fetched")
+            continue
 
         for offset in range(0, 100, 10):
-            url = URL_TEMPLATE.format(
-                contract_address=item["contract_address"], offset=offset
-            )
-            response = requests.get(url, headers=headers)
+            if journal.has_page(token, offset):
+                continue
+            url = URL_TEMPLATE.format(contract_address=token, offset=offset)
+            response = governed_request("birdeye", "GET", url, headers=headers)
+            if response.status_code != 200:
+                print(f"Failed to retrieve data. Status code: {response.status_code}")
+                break
             data = response.json().get("data", {}).get("items", [])
-            wallet_address_list.extend(data)
-
-        with open(f"./top_trader/{item['token_name']}.json", "w") as wallet_data:
-            json.dump(wallet_address_list, wallet_data, indent=4)
-
-
-def append_trader_data_to_excel(contract_addresses):
-    workbook = load_workbook(EXCEL_FILE)
+            journal.save_page(token, offset, data)
+        else:
+            with open(previous_traders_file(item), "w") as wallet_data:
+                json.dump(list(journal.token_items(token)), wallet_data, indent=4)
+            journal.mark_token_done(token)
+
+
+def append_trader_data_to_excel(contract_addresses, journal):
+    # Write-only sheets stream rows to disk as they are appended, so only one
+    # token's traders are held in memory at a time.
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title="Top Projects")
+    sheet.append(["Token Name", "Contract Address", "Pair Address"])
+    for item in contract_addresses:
+        sheet.append([item["token_name"], item["contract_address"], item["pair_address"]])
 
     for item in contract_addresses:
         new_sheet = workbook.create_sheet(title=item["token_name"])
-        file_path = f"./top_trader/{item['token_name']}.json"
-
-        with open(file_path, "r") as trader_file:
-            json_data = json.load(trader_file)
-
-        for index, value in enumerate(json_data):
-            new_sheet.cell(row=index + 1, column=1).value = value["owner"]
+        for value in token_traders(item, journal):
+            new_sheet.append([value["owner"]])
 
     workbook.save(EXCEL_FILE)
 
 
 def main():
-    wb, sheet = set_excel()
-    driver = setup_driver()
-    contract_addresses = get_contract_addresses(driver, wb, sheet)
-
-    get_top_trader_address(contract_addresses)
-    append_trader_data_to_excel(contract_addresses)
+    # An unfinished run resumes from JOURNAL_FILE; a finished one archives it.
+    journal = Journal(JOURNAL_FILE)
+    discovery = Discovery(smart_money=Watchlist().wallets)
+    try:
+        # The journal holds the whole top-k, each flagged with whether it
+        # changed; only changed tokens are fetched again, the workbook covers
+        # all of them.
+        contract_addresses = journal.projects
+        if contract_addresses is None:
+            ranked, selected, contract_addresses = get_contract_addresses(
+                setup_driver(), discovery
+            )
+            if contract_addresses:
+                journal.save_projects(contract_addresses)
+            if ranked:
+                discovery.mark_pushed(ranked, selected)
+
+        fetched = [item for item in contract_addresses if needs_fetch(item)]
+        get_top_trader_address(fetched, journal)
+        for item in contract_addresses:
+            traders = token_traders(item, journal)
+            if traders:
+                discovery.observe_traders(
+                    item["contract_address"], [value["owner"] for value in traders]
+                )
+        discovery.save()
+        append_trader_data_to_excel(contract_addresses, journal)
+        tokens = [item["contract_address"] for item in fetched]
+        if journal.all_done(tokens):
+            journal.archive()
+        else:
+            print(f"Some tokens failed; run again to resume from {JOURNAL_FILE}")
+    finally:
+        journal.close()
 
 
 if __name__ == "__main__":
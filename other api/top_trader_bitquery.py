@@ -1,15 +1,22 @@
 # Get top 100 traders using Bitquery.
 
 import os
-import requests
+import sys
 import json
 from dotenv import load_dotenv
+from checkpoint import Journal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rate_limit import governed_request
+from decoding import bitquery_traders, dumps
 
 load_dotenv()
 bitquery_api = os.getenv("BITQUERY_API_KEY")
 
+JOURNAL_FILE = "checkpoint_bitquery.jsonl"
+
 
-def get_top_trader_address(contract_addresses):
+def get_top_trader_address(contract_addresses, journal):
     post_url = "https://streaming.bitquery.io/eap"
 
     for item in contract_addresses:
@@ -17,6 +24,10 @@ def get_top_trader_address(contract_addresses):
             f"--------------------- {contract_addresses.index(item) + 1} ---------------------"
         )
 
+        if journal.is_token_done(item["contract_address"]):
+            print(f"Skipping {item['token_name']}: already fetched")
+            continue
+
         payload = json.dumps(
             {
                 "query": """query TopTradersByPnL($token: String!, $base: String!) {
@@ -48,15 +59,42 @@ def get_top_trader_address(contract_addresses):
             "Authorization": f"Bearer {bitquery_api}",
         }
 
-        response = requests.request("POST", post_url, headers=headers, data=payload)
+        response = governed_request(
+            "bitquery", "POST", post_url, headers=headers, data=payload
+        )
+        if response.status_code != 200:
+            print(f"Failed to retrieve data. Status code: {response.status_code}")
+            continue
 
-        json_data = json.loads(response.text)["data"]["Solana"]["DEXTradeByTokens"]
+        json_data = bitquery_traders(response.content)
 
         print(len(json_data))
 
         os.makedirs("./top_trader", exist_ok=True)
 
-        with open(
-            f"./top_trader/{item["token_name"]}.json", "w", encoding="utf-8"
-        ) as data:
-            json.dump(json_data, data, indent=4)
+        with open(f"./top_trader/{item['token_name']}.json", "wb") as data:
+            data.write(dumps(json_data))
+
+        journal.save_page(item["contract_address"], 0, json_data)
+        journal.mark_token_done(item["contract_address"])
+
+
+def main():
+    # Uses the token list scraped by top_trader_birdeye.py.
+    with open("contract_address_list.json", "r", encoding="utf-8") as data_file:
+        contract_addresses = json.load(data_file)
+
+    journal = Journal(JOURNAL_FILE)
+    try:
+        get_top_trader_address(contract_addresses, journal)
+        tokens = [item["contract_address"] for item in contract_addresses]
+        if journal.all_done(tokens):
+            journal.archive()
+        else:
+            print(f"Some tokens failed; run again to resume from {JOURNAL_FILE}")
+    finally:
+        journal.close()
+
+
+if __name__ == "__main__":
+    main()
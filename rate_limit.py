@@ -0,0 +1,173 @@
+# Per-provider request pacing shared by every thread in the process.
+
+import time
+import threading
+import requests
+
+from replay import configure_session
+
+# Starting and ceiling rates in requests per second.
+PROVIDER_LIMITS = {
+    "dexscreener": {"rate": 4.0, "max_rate": 5.0, "burst": 5},
+    "gmgn": {"rate": 2.0, "max_rate": 5.0, "burst": 2},
+    "birdeye": {"rate": 1.0, "max_rate": 15.0, "burst": 1},
+    "bitquery": {"rate": 1.0, "max_rate": 10.0, "burst": 1},
+}
+MIN_RATE = 0.1
+INCREASE_STEP = 0.25
+DECREASE_FACTOR = 0.5
+MAX_RETRIES = 5
+POLL_SECONDS = 0.1
+
+# One pooled session for every provider; replay.py can swap its transport.
+session = configure_session(requests.Session())
+
+
+class Cancelled(requests.exceptions.RequestException):
+    """A governed request was cancelled or would run past its deadline."""
+
+
+def wait(seconds, should_stop=None, deadline=None):
+    """Sleep ``seconds``, waking every POLL_SECONDS to check ``should_stop``.
+
+    ``deadline`` is a ``time.monotonic()`` value; a wait that would end after
+    it raises straight away instead of sleeping for nothing.
+    """
+    end = time.monotonic() + seconds
+    if deadline is not None and end > deadline:
+        raise Cancelled("Deadline reached while waiting for the rate limit")
+    while True:
+        if should_stop is not None and should_stop():
+            raise Cancelled("Request cancelled")
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, POLL_SECONDS))
+
+
+class RateGovernor:
+    """Token bucket whose refill rate adapts to the upstream (AIMD).
+
+    ``acquire`` reserves the next free slot and sleeps until it arrives, so
+    callers queue up in arrival order instead of all retrying at once. Every
+    success nudges the rate up by ``INCREASE_STEP``; a 429 halves it.
+    """
+
+    def __init__(self, rate, max_rate, burst):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, should_stop=None, deadline=None):
+        with self.lock:
+            now = time.monotonic()
+            self.refill(now)
+            self.tokens -= 1
+            delay = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            delay = max(delay, self.blocked_until - now)
+        try:
+            wait(delay, should_stop, deadline)
+        except Cancelled:
+            # Hand the reserved slot back to the callers still queued.
+            with self.lock:
+                self.tokens += 1
+            raise
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + INCREASE_STEP)
+
+    def on_throttled(self, retry_after=None):
+        with self.lock:
+            now = time.monotonic()
+            self.refill(now)
+            self.rate = max(MIN_RATE, self.rate * DECREASE_FACTOR)
+            self.tokens = min(self.tokens, 0)
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def observe_headers(self, headers):
+        remaining = header_number(headers, "X-RateLimit-Remaining")
+        if remaining is None or remaining > 0:
+            return
+        reset = header_number(headers, "X-RateLimit-Reset")
+        if reset is None:
+            return
+        # Reset is either seconds-until-reset or an epoch timestamp.
+        delay = reset - time.time() if reset > 1e9 else reset
+        if delay > 0:
+            with self.lock:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+
+def header_number(headers, name):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+governors = {}
+governors_lock = threading.Lock()
+# Fraction of every provider's budget this process may use.
+budget_share = 1.0
+
+
+def split_budget(processes):
+    """Give this process 1/``processes`` of every provider's budget.
+
+    Governors only pace the threads of one process, so ``processes`` workers
+    hitting the same upstreams must each call this before their first request
+    to stay within the limits together.
+    """
+    global budget_share
+    with governors_lock:
+        budget_share = 1.0 / max(1, processes)
+        governors.clear()
+
+
+def get_governor(provider):
+    with governors_lock:
+        governor = governors.get(provider)
+        if governor is None:
+            limits = PROVIDER_LIMITS[provider]
+            governor = governors[provider] = RateGovernor(
+                **{name: value * budget_share for name, value in limits.items()}
+            )
+        return governor
+
+
+def governed_request(provider, method, url, should_stop=None, deadline=None, **kwargs):
+    """``session.request`` paced by the provider's governor, retrying 429s.
+
+    Raises ``Cancelled`` once ``should_stop()`` is true or the monotonic
+    ``deadline`` passes, including while waiting out a throttle, and never
+    lets one attempt's timeout run past the deadline.
+    """
+    governor = get_governor(provider)
+    for _ in range(MAX_RETRIES):
+        governor.acquire(should_stop, deadline)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise Cancelled("Deadline reached")
+            kwargs["timeout"] = min(kwargs.get("timeout") or remaining, remaining)
+        response = session.request(method, url, **kwargs)
+        governor.observe_headers(response.headers)
+        if response.status_code != 429:
+            if response.status_code < 400:
+                governor.on_success()
+            return response
+        governor.on_throttled(header_number(response.headers, "Retry-After"))
+    return response
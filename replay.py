@@ -0,0 +1,270 @@
+# Record upstream HTTP traffic to an archive and serve it back offline.
+#
+# Recording: set HTTP_RECORD_FILE=capture.jsonl.gz and use the app or scripts
+# as usual; every request made through rate_limit.governed_request is saved.
+#
+# Replaying: start the stand-in server, then point HTTP_REPLAY_URL at it so
+# every upstream request is sent there instead of the real host.
+#
+#   python replay.py serve capture.jsonl.gz --port 8800 --latency 0.2 --error-rate 0.05
+#   HTTP_REPLAY_URL=http://127.0.0.1:8800 python app.py
+
+import os
+import gzip
+import json
+import time
+import base64
+import zlib
+import random
+import hashlib
+import argparse
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+load_dotenv()
+http_record_file = os.getenv("HTTP_RECORD_FILE")
+http_replay_url = os.getenv("HTTP_REPLAY_URL")
+
+ORIGINAL_URL_HEADER = "X-Replay-Url"
+BLOCK_SIZE = 1 << 20
+KEPT_HEADERS = (
+    "Content-Type",
+    "Retry-After",
+    "X-RateLimit-Limit",
+    "X-RateLimit-Remaining",
+    "X-RateLimit-Reset",
+)
+
+
+def body_digest(body):
+    if body is None:
+        body = b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return hashlib.sha1(body).hexdigest()
+
+
+def exchange_key(method, url, body):
+    return f"{method} {url} {body_digest(body)}"
+
+
+def read_members(archive_path):
+    """Yield (decompressed bytes, end offset) for each complete gzip member.
+
+    A crash mid-write leaves a torn last member; reading stops before it.
+    """
+    with open(archive_path, "rb") as archive:
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        output = []
+        offset = 0
+        data = archive.read(BLOCK_SIZE)
+        while data:
+            try:
+                output.append(decoder.decompress(data))
+            except zlib.error:
+                return
+            if decoder.eof:
+                unused = decoder.unused_data
+                end = offset + len(data) - len(unused)
+                yield b"".join(output), end
+                decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                output = []
+                offset = end
+                data = unused or archive.read(BLOCK_SIZE)
+            else:
+                offset += len(data)
+                data = archive.read(BLOCK_SIZE)
+
+
+def complete_size(archive_path):
+    """Byte length of the archive up to the end of its last whole member."""
+    end = 0
+    for _, end in read_members(archive_path):
+        pass
+    return end
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter that appends every exchange to a gzip NDJSON archive.
+
+    Each write is its own gzip member, so the archive stays readable even if
+    the process dies mid-session.
+    """
+
+    def __init__(self, archive_path, **kwargs):
+        super().__init__(**kwargs)
+        self.archive_path = archive_path
+        self.lock = threading.Lock()
+
+        # Drop a torn last member so new exchanges aren't appended behind it.
+        if os.path.exists(archive_path):
+            end = complete_size(archive_path)
+            if end < os.path.getsize(archive_path):
+                os.truncate(archive_path, end)
+
+    def send(self, request, **kwargs):
+        started = time.monotonic()
+        response = super().send(request, **kwargs)
+        exchange = {
+            "key": exchange_key(request.method, request.url, request.body),
+            "status": response.status_code,
+            "headers": {
+                name: response.headers[name]
+                for name in KEPT_HEADERS
+                if name in response.headers
+            },
+            "body": base64.b64encode(response.content).decode("ascii"),
+            "elapsed": time.monotonic() - started,
+        }
+        line = (json.dumps(exchange) + "\n").encode("utf-8")
+        with self.lock:
+            with gzip.open(self.archive_path, "ab") as archive:
+                archive.write(line)
+        return response
+
+
+class RedirectAdapter(HTTPAdapter):
+    """Transport adapter that sends every request to the replay server."""
+
+    def __init__(self, replay_url, **kwargs):
+        super().__init__(**kwargs)
+        self.replay_url = replay_url.rstrip("/")
+
+    def send(self, request, **kwargs):
+        request.headers[ORIGINAL_URL_HEADER] = request.url
+        parts = urlsplit(request.url)
+        request.url = f"{self.replay_url}{parts.path or '/'}"
+        if parts.query:
+            request.url += f"?{parts.query}"
+        return super().send(request, **kwargs)
+
+
+def configure_session(session):
+    """Mount the record or replay adapter selected by the environment."""
+    if http_replay_url:
+        adapter = RedirectAdapter(http_replay_url)
+    elif http_record_file:
+        adapter = RecordingAdapter(http_record_file)
+    else:
+        return session
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def load_archive(archive_path):
+    exchanges = defaultdict(list)
+    for member, _ in read_members(archive_path):
+        for line in member.splitlines():
+            if line.strip():
+                exchange = json.loads(line)
+                exchanges[exchange["key"]].append(exchange)
+    return exchanges
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Serve archived responses, cycling through repeats of the same request."""
+
+    daemon_threads = True
+
+    def __init__(self, address, exchanges, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=503):
+        super().__init__(address, ReplayHandler)
+        self.exchanges = exchanges
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.cursors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def next_exchange(self, key):
+        with self.lock:
+            candidates = self.exchanges.get(key)
+            if not candidates:
+                return None
+            index = self.cursors[key]
+            self.cursors[key] = (index + 1) % len(candidates)
+            return candidates[index]
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def handle_any(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        url = self.headers.get(ORIGINAL_URL_HEADER, self.path)
+
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if random.random() < server.error_rate:
+            self.respond(server.error_status, {"Retry-After": "1"}, b"")
+            return
+
+        exchange = server.next_exchange(exchange_key(self.command, url, body))
+        if exchange is None:
+            self.respond(404, {}, b'{"message": "not in replay archive"}')
+            return
+        self.respond(
+            exchange["status"], exchange["headers"], base64.b64decode(exchange["body"])
+        )
+
+    def respond(self, status, headers, body):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = handle_any
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured upstream traffic.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve")
+    serve_parser.add_argument("archive")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8800)
+    serve_parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    serve_parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    serve_parser.add_argument("--error-rate", type=float, default=0.0)
+    serve_parser.add_argument("--error-status", type=int, default=503)
+
+    stats_parser = commands.add_parser("stats")
+    stats_parser.add_argument("archive")
+
+    args = parser.parse_args()
+    exchanges = load_archive(args.archive)
+
+    if args.command == "stats":
+        total = sum(len(items) for items in exchanges.values())
+        print(f"{total} exchanges, {len(exchanges)} distinct requests")
+        return
+
+    server = ReplayServer(
+        (args.host, args.port),
+        exchanges,
+        args.latency,
+        args.jitter,
+        args.error_rate,
+        args.error_status,
+    )
+    print(f"Replaying {args.archive} on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import requests
+
+import top_trader_bitquery
+from checkpoint import Journal
+
+
+def test_throttled_token_is_left_unfinished(tmp_path, monkeypatch):
+    def throttled(*args, **kwargs):
+        response = requests.Response()
+        response.status_code = 429
+        response._content = b'{"errors": "rate limited"}'
+        return response
+
+    monkeypatch.setattr(top_trader_bitquery, "governed_request", throttled)
+    monkeypatch.chdir(tmp_path)
+    journal = Journal(str(tmp_path / "checkpoint_bitquery.jsonl"))
+
+    tokens = [{"contract_address": "t1", "token_name": "One"}]
+    top_trader_bitquery.get_top_trader_address(tokens, journal)
+
+    assert not journal.is_token_done("t1")
+    assert not (tmp_path / "top_trader").exists()
+    journal.close()
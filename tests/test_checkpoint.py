@@ -0,0 +1,46 @@
+import json
+
+from checkpoint import Journal
+
+
+def test_resume_restores_pages_and_drops_torn_line(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    journal = Journal(str(path))
+    journal.save_projects([{"contract_address": "t1"}, {"contract_address": "t2"}])
+    journal.save_page("t1", 10, [{"owner": "b"}])
+    journal.save_page("t1", 0, [{"owner": "a"}])
+    journal.mark_token_done("t1")
+    journal.save_page("t2", 0, [{"owner": "c"}])
+    journal.close()
+    complete = path.read_bytes()
+    with open(path, "ab") as journal_file:
+        journal_file.write(b'{"kind": "page", "token": "t2", "offset": 10, "it')
+
+    journal = Journal(str(path))
+    assert path.read_bytes() == complete
+    assert journal.projects == [{"contract_address": "t1"}, {"contract_address": "t2"}]
+    assert journal.is_token_done("t1") and not journal.is_token_done("t2")
+    assert journal.has_page("t2", 0) and not journal.has_page("t2", 10)
+    assert [item["owner"] for item in journal.token_items("t1")] == ["a", "b"]
+
+    # New entries land after the last whole line, not behind the torn one.
+    journal.save_page("t2", 10, [{"owner": "d"}])
+    journal.mark_token_done("t2")
+    assert [item["owner"] for item in journal.token_items("t2")] == ["c", "d"]
+    assert journal.all_done(["t1", "t2"])
+    journal.close()
+    lines = path.read_bytes().splitlines()
+    assert all(json.loads(line) for line in lines)
+
+
+def test_archive_moves_journal_aside(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    journal = Journal(str(path))
+    journal.mark_token_done("t1")
+    journal.archive()
+
+    assert not path.exists()
+    assert (tmp_path / "checkpoint.jsonl.done").exists()
+    fresh = Journal(str(path))
+    assert fresh.done_tokens == set()
+    fresh.close()
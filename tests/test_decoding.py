@@ -0,0 +1,79 @@
+import json
+import math
+
+import pytest
+
+import decoding
+from models import TopProject, WalletStats
+
+
+@pytest.fixture(params=["msgspec", "fallback"])
+def decoder(request, monkeypatch):
+    if request.param == "fallback":
+        monkeypatch.setattr(decoding, "msgspec", None)
+    return decoding
+
+
+def test_bitquery_null_pnl_is_zero(decoder):
+    rows = [
+        {"Trade": {"Account": {"Owner": "a"}}, "pnl": None},
+        {"Trade": {"Account": {"Owner": "b"}}, "pnl": "1.5"},
+        {"Trade": {"Account": {"Owner": "c"}}},
+    ]
+    content = json.dumps({"data": {"Solana": {"DEXTradeByTokens": rows}}})
+    assert decoder.bitquery_traders(content.encode("utf-8")) == [
+        {"owner": "a", "pnl": 0.0},
+        {"owner": "b", "pnl": 1.5},
+        {"owner": "c", "pnl": 0.0},
+    ]
+
+
+def test_message_schemas(decoder):
+    wallet = {
+        "wallet_address": "w",
+        "win_rate": "45%",
+        "transactions": 12,
+        "pnl": "$1.2K",
+        "distribution_num": 5,
+        "distribution": [1, 2, 3, 4, 5],
+        "dumps": 0,
+        "unused": {"nested": [1, 2, 3]},
+    }
+    content = json.dumps({"message": [wallet]}).encode("utf-8")
+    items = decoder.wallet_items(content)
+    assert items[0]["win_rate"] == "45%"
+    assert items[0]["distribution"] == [1, 2, 3, 4, 5]
+
+    content = json.dumps({"message": ["w1", "w2"]}).encode("utf-8")
+    assert decoder.top_trader_wallets(content) == ["w1", "w2"]
+
+    project = {
+        "token_name": "T",
+        "token_symbol": "T",
+        "contract_address": "ca",
+        "volume": "$1.2M",
+    }
+    content = json.dumps({"message": [project]}).encode("utf-8")
+    assert decoder.top_project_items(content)[0]["contract_address"] == "ca"
+
+
+def test_nulls_and_odd_values_decode_like_the_fallback(decoder):
+    wallet = {
+        "wallet_address": None,
+        "win_rate": None,
+        "transactions": {"total": 3},
+        "distribution": [1, {"bucket": 2}, None],
+    }
+    content = json.dumps({"message": [wallet]}).encode("utf-8")
+    [stats] = [WalletStats.from_dict(item) for item in decoder.wallet_items(content)]
+    assert stats.wallet_address == ""
+    assert stats.above_500 == 1
+    assert math.isnan(stats.transactions) and math.isnan(stats.from_200_to_500)
+
+    project = {"token_name": None, "token_symbol": "T", "contract_address": "ca"}
+    content = json.dumps({"message": [project]}).encode("utf-8")
+    [top_project] = [
+        TopProject.from_dict(item) for item in decoder.top_project_items(content)
+    ]
+    assert (top_project.token_name, top_project.contract_address) == ("", "ca")
+    assert math.isnan(top_project.volume)
@@ -0,0 +1,48 @@
+import pandas as pd
+
+import dedup
+from dedup import best_rank
+
+
+def write_exports(tmp_path):
+    pd.DataFrame(
+        {
+            "Pair Address": ["p1", "p1", "p1"],
+            "Wallet Address": ["a", "b", "c"],
+            "Rank": [3, 1, 2],
+        }
+    ).to_csv(tmp_path / "traders.csv", index=False)
+    pd.DataFrame(
+        {"Pair Address": ["p2", "p2"], "Wallet Address": ["a", "d"], "Rank": [1, 5]}
+    ).to_excel(tmp_path / "traders.xlsx", index=False)
+    # No Rank column: the row order is the rank, the file name the source.
+    pd.DataFrame({"Wallet Address": ["d", "e", None, "b"]}).to_excel(
+        tmp_path / "wallets.xlsx", index=False
+    )
+    return [
+        str(tmp_path / "traders.csv"),
+        str(tmp_path / "traders.xlsx"),
+        str(tmp_path / "wallets.xlsx"),
+    ]
+
+
+EXPECTED = [
+    ("a", 1, "p2"),
+    ("b", 1, "p1"),
+    ("d", 1, "wallets.xlsx"),
+    ("c", 2, "p1"),
+    ("e", 2, "wallets.xlsx"),
+]
+
+
+def merged(frame):
+    return [tuple(values) for values in frame.itertuples(index=False)]
+
+
+def test_best_rank_keeps_minimum_rank_and_its_source(tmp_path):
+    assert merged(best_rank(write_exports(tmp_path))) == EXPECTED
+
+
+def test_best_rank_reads_excel_in_worker_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup.os, "cpu_count", lambda: 2)
+    assert merged(best_rank(write_exports(tmp_path))) == EXPECTED
@@ -0,0 +1,80 @@
+import math
+
+from discovery import Discovery
+
+NOW = 1_700_000_000
+
+
+def discovery(tmp_path, **kwargs):
+    return Discovery(str(tmp_path / "discovery.json"), **kwargs)
+
+
+def tokens(entries):
+    return [token for _, token, _ in entries]
+
+
+def test_rank_scores_volume_age_and_smart_money(tmp_path):
+    found = discovery(tmp_path, smart_money={"whale"})
+    found.observe_traders("smart", ["whale", "minnow"])
+    ranked = found.rank(
+        [
+            [("big", 1000.0, math.nan, None), ("small", 10.0, math.nan, None)],
+            [
+                ("new", 10.0, NOW, None),
+                ("smart", 10.0, math.nan, None),
+                ("big", 1000.0, math.nan, None),
+            ],
+        ],
+        now=NOW,
+    )
+    # smart: half its traders are watchlist wallets; new: created just now.
+    assert tokens(ranked) == ["smart", "big", "new", "small"]
+
+
+def test_rank_keeps_only_the_best_candidates(tmp_path):
+    found = discovery(tmp_path, top_k=2, candidate_limit=3)
+    pages = [
+        [
+            (f"t{index}", 100.0 - index, math.nan, None)
+            for index in range(start, start + 5)
+        ]
+        for start in range(0, 20, 5)
+    ]
+    assert tokens(found.rank(pages, now=NOW)) == ["t0", "t1", "t2"]
+
+
+def test_select_only_new_or_moved_top_k(tmp_path):
+    found = discovery(tmp_path, top_k=2)
+    ranked = [(3.0, "a", None), (2.0, "b", None), (1.0, "c", None)]
+    assert tokens(found.select(ranked)) == ["a", "b"]
+
+    found.mark_pushed(ranked, found.select(ranked))
+    assert found.select(ranked) == []
+
+    # a moved by more than the threshold, b by less; c is outside the top-k.
+    moved = [(2.0, "a", None), (1.95, "b", None), (0.5, "c", None)]
+    assert tokens(found.select(moved)) == ["a"]
+
+
+def test_mark_pushed_forgets_tokens_that_left_the_top_k(tmp_path):
+    found = discovery(tmp_path, top_k=2)
+    ranked = [(3.0, "a", None), (2.0, "b", None), (1.0, "c", None)]
+    found.mark_pushed(ranked, found.select(ranked))
+
+    ranked = [(3.0, "a", None), (2.5, "c", None), (2.0, "b", None)]
+    found.mark_pushed(ranked, found.select(ranked))
+    assert found.pushed == {"a": 3.0, "c": 2.5}
+
+    ranked = [(3.0, "a", None), (2.5, "b", None)]
+    assert tokens(found.select(ranked)) == ["b"]
+
+
+def test_state_survives_a_restart(tmp_path):
+    found = discovery(tmp_path, top_k=2)
+    found.observe_traders("a", ["w2", "w1", "w2"])
+    ranked = [(3.0, "a", None), (2.0, "b", None)]
+    found.mark_pushed(ranked, found.select(ranked))
+
+    restarted = discovery(tmp_path, top_k=2)
+    assert restarted.traders == {"a": ["w1", "w2"]}
+    assert restarted.select(ranked) == []
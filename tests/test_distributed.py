@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import distributed
+import fetchers
+import rate_limit
+from models import TopTrader
+
+
+class TopTraderHandler(BaseHTTPRequestHandler):
+    """Serve five wallets per pair; "bad" always fails, "flaky" fails once."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        (pair,) = json.loads(self.rfile.read(length))["pair_address_list"]
+        server = self.server
+        with server.lock:
+            server.calls[pair] = server.calls.get(pair, 0) + 1
+            server.times.append(time.monotonic())
+            calls = server.calls[pair]
+
+        if pair == "bad" or (pair == "flaky" and calls == 1):
+            body, status = b"{}", 500
+        else:
+            wallets = [f"{pair}-w{index}" for index in range(5)]
+            body, status = json.dumps({"message": wallets}).encode("utf-8"), 200
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TopTraderHandler)
+    server.lock = threading.Lock()
+    server.calls = {}
+    server.times = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    # Worker processes are forked, so they inherit these patches.
+    monkeypatch.setattr(
+        fetchers, "dexscreener_request_url", f"http://127.0.0.1:{server.server_port}"
+    )
+    monkeypatch.setattr(distributed, "IDLE_SECONDS", 0.05)
+    monkeypatch.setattr(distributed, "RETRY_SECONDS", 0.05)
+    monkeypatch.setattr(distributed, "MAX_ATTEMPTS", 3)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_run_with_several_processes(backend, tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    pairs = [f"p{index}" for index in range(6)] + ["flaky", "bad"]
+    job_id = distributed.run_local(db_path, "pair", pairs, processes=3)
+
+    assert distributed.status(db_path, job_id) == {"done": 7, "failed": 1}
+    assert backend.calls["flaky"] == 2
+    assert backend.calls["bad"] == distributed.MAX_ATTEMPTS
+
+    with pytest.raises(RuntimeError):
+        distributed.collect(db_path, job_id)
+    cls, records = distributed.collect(db_path, job_id, allow_partial=True)
+    assert cls is TopTrader
+    assert len(records) == 7 * 5
+    assert {record.pair_address for record in records} == set(pairs) - {"bad"}
+
+
+def test_redone_shard_replaces_its_rows(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    job_id = distributed.submit(db_path, "pair", ["p1"])
+    connection = distributed.connect(db_path)
+    try:
+        first = [TopTrader("p1", "a", 1), TopTrader("p1", "b", 2)]
+        distributed.complete(connection, job_id, 0, "pair", first)
+        distributed.complete(connection, job_id, 0, "pair", [TopTrader("p1", "b", 1)])
+    finally:
+        connection.close()
+
+    _, records = distributed.collect(db_path, job_id)
+    assert [(record.wallet_address, record.rank) for record in records] == [("b", 1)]
+
+
+def test_processes_share_one_rate_budget(backend, tmp_path, monkeypatch):
+    monkeypatch.setitem(
+        rate_limit.PROVIDER_LIMITS,
+        "dexscreener",
+        {"rate": 10.0, "max_rate": 10.0, "burst": 1},
+    )
+    db_path = str(tmp_path / "jobs.db")
+    pairs = [f"p{index}" for index in range(24)]
+    job_id = distributed.run_local(db_path, "pair", pairs, processes=4)
+
+    assert distributed.status(db_path, job_id) == {"done": 24}
+    # Four processes at their own 10/s would land all 24 within ~0.6s.
+    busiest = max(
+        sum(1 for other in backend.times if start <= other < start + 1)
+        for start in backend.times
+    )
+    assert busiest <= 12
@@ -0,0 +1,58 @@
+import os
+import shutil
+from datetime import datetime, timezone
+
+from history_store import COMPACTED_FILE, MANIFEST_FILE, TEMP_FILE, HistoryStore
+from models import TopTrader
+
+CAPTURED_AT = datetime(2024, 1, 1, 12, tzinfo=timezone.utc).timestamp()
+
+
+def fill(store, snapshots=3):
+    for index in range(snapshots):
+        store.append(
+            "top_traders",
+            [TopTrader("p1", f"w{index}", 1), TopTrader("p1", "w", 2)],
+            CAPTURED_AT + index,
+        )
+    day = store.days("top_traders")[0]
+    return store.partition("top_traders", day), day
+
+
+def row_count(store):
+    return int(store.query("SELECT COUNT(*) AS n FROM top_traders")["n"][0])
+
+
+def test_compact_keeps_every_row(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    partition, day = fill(store)
+    store.compact("top_traders", day)
+
+    assert sorted(os.listdir(partition)) == [COMPACTED_FILE]
+    assert row_count(store) == 6
+
+
+def test_crash_before_swap_rolls_back(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    partition, _ = fill(store)
+    parts = sorted(os.listdir(partition))
+    shutil.copy(os.path.join(partition, parts[0]), os.path.join(partition, TEMP_FILE))
+    open(os.path.join(partition, MANIFEST_FILE), "w").write("[]")
+
+    assert row_count(store) == 6
+    assert sorted(os.listdir(partition)) == parts
+
+
+def test_crash_after_swap_finishes_cleanup(tmp_path, monkeypatch):
+    store = HistoryStore(str(tmp_path))
+    partition, day = fill(store)
+    parts = sorted(os.listdir(partition))
+
+    # Stop right after the compacted file replaced the parts.
+    monkeypatch.setattr(store, "recover", lambda partition: None)
+    store.compact("top_traders", day)
+    monkeypatch.undo()
+    assert set(os.listdir(partition)) == set(parts) | {COMPACTED_FILE, MANIFEST_FILE}
+
+    assert row_count(store) == 6
+    assert sorted(os.listdir(partition)) == [COMPACTED_FILE]
@@ -0,0 +1,48 @@
+import math
+
+from models import TopTrader, WalletStats, number, timestamp
+
+
+def test_number_formats():
+    assert number("$1.2M") == 1_200_000
+    assert number("45%") == 45
+    assert number("1,234") == 1234
+    assert math.isnan(number(None))
+    assert math.isnan(number("n/a"))
+
+
+def test_wallet_stats_tolerates_odd_values():
+    stats = WalletStats.from_dict(
+        {
+            "wallet_address": "w",
+            "win_rate": "45%",
+            "transactions": "1.2K",
+            "pnl": None,
+            "distribution_num": "3.0",
+            "distribution": [1, "bad"],
+            "dumps": 2,
+        }
+    )
+    assert stats.win_rate == 45
+    assert stats.transactions == 1200
+    assert math.isnan(stats.pnl)
+    assert stats.above_500 == 1
+    assert math.isnan(stats.from_200_to_500)
+    assert math.isnan(stats.below_minus_50)
+    assert stats.dumps == 2
+
+
+def test_request_url_top_traders_leave_stats_missing():
+    record = TopTrader("p1", "w", 1)
+    assert math.isnan(record.volume)
+    assert math.isnan(record.pnl)
+    assert math.isnan(record.trades)
+
+
+def test_timestamp_formats():
+    assert timestamp(1_700_000_000) == 1_700_000_000
+    assert timestamp("1700000000000") == 1_700_000_000
+    assert timestamp("2023-11-14T22:13:20Z") == 1_700_000_000
+    assert math.isnan(timestamp(None))
+    assert math.isnan(timestamp("3 days ago"))
+    assert math.isnan(timestamp({"seconds": 1}))
@@ -0,0 +1,117 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import rate_limit
+from rate_limit import governed_request, get_governor
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """Answer 429 for the first ``throttled`` requests, then 200."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            throttled = server.requests <= server.throttled
+        if throttled:
+            self.send_response(429)
+            self.send_header("Retry-After", str(server.retry_after))
+            self.send_header("X-RateLimit-Remaining", "0")
+            self.send_header("X-RateLimit-Reset", str(server.retry_after))
+        else:
+            self.send_response(200)
+            self.send_header("X-RateLimit-Remaining", "100")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setitem(
+        rate_limit.PROVIDER_LIMITS, "stub", {"rate": 4.0, "max_rate": 5.0, "burst": 1}
+    )
+    monkeypatch.setattr(rate_limit, "governors", {})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.throttled = 0
+    server.retry_after = 0.3
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url(server):
+    return f"http://127.0.0.1:{server.server_port}/"
+
+
+def test_backs_off_on_429_and_recovers(stub, monkeypatch):
+    monkeypatch.setattr(rate_limit, "INCREASE_STEP", 1.0)
+    stub.throttled = 2
+    started = time.monotonic()
+    response = governed_request("stub", "GET", url(stub))
+    elapsed = time.monotonic() - started
+
+    assert response.status_code == 200
+    assert stub.requests == 3
+    # Both Retry-After waits were honoured before the successful retry.
+    assert elapsed >= 2 * stub.retry_after
+    governor = get_governor("stub")
+    assert governor.rate == pytest.approx(4.0 * 0.5 * 0.5 + rate_limit.INCREASE_STEP)
+
+    for _ in range(3):
+        governed_request("stub", "GET", url(stub))
+    assert governor.rate == governor.max_rate
+
+
+def test_gives_up_after_max_retries(stub, monkeypatch):
+    monkeypatch.setitem(
+        rate_limit.PROVIDER_LIMITS,
+        "stub",
+        {"rate": 200.0, "max_rate": 200.0, "burst": 1},
+    )
+    stub.throttled = 100
+    stub.retry_after = 0
+    response = governed_request("stub", "GET", url(stub))
+    assert response.status_code == 429
+    assert stub.requests == rate_limit.MAX_RETRIES
+    assert get_governor("stub").rate == pytest.approx(
+        200.0 * rate_limit.DECREASE_FACTOR**rate_limit.MAX_RETRIES
+    )
+
+
+def test_exhausted_quota_blocks_until_reset():
+    governor = rate_limit.RateGovernor(rate=100.0, max_rate=100.0, burst=10)
+    governor.observe_headers({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0.3"})
+    started = time.monotonic()
+    governor.acquire()
+    assert time.monotonic() - started >= 0.25
+
+
+def test_cancel_interrupts_retry_after_wait(stub):
+    stub.throttled = 100
+    stub.retry_after = 30
+    cancel_at = time.monotonic() + 0.3
+    started = time.monotonic()
+    with pytest.raises(rate_limit.Cancelled):
+        governed_request(
+            "stub", "GET", url(stub), should_stop=lambda: time.monotonic() > cancel_at
+        )
+    assert time.monotonic() - started < 2
+
+
+def test_deadline_refuses_to_wait_past_it(stub):
+    stub.throttled = 100
+    stub.retry_after = 30
+    started = time.monotonic()
+    with pytest.raises(rate_limit.Cancelled):
+        governed_request("stub", "GET", url(stub), deadline=time.monotonic() + 1)
+    assert time.monotonic() - started < 1
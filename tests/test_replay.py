@@ -0,0 +1,67 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import replay
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = f"echo {self.path}".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def record(archive_path, paths):
+    upstream = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+    base_url = serve(upstream)
+    session = requests.Session()
+    session.mount("http://", replay.RecordingAdapter(archive_path))
+    try:
+        for path in paths:
+            session.get(f"{base_url}{path}", timeout=5)
+    finally:
+        upstream.shutdown()
+        upstream.server_close()
+    return base_url
+
+
+def test_record_then_replay(tmp_path):
+    archive_path = str(tmp_path / "capture.jsonl.gz")
+    base_url = record(archive_path, ["/a?x=1", "/b"])
+
+    server = replay.ReplayServer(("127.0.0.1", 0), replay.load_archive(archive_path))
+    session = requests.Session()
+    session.mount("http://", replay.RedirectAdapter(serve(server)))
+    try:
+        assert session.get(f"{base_url}/a?x=1", timeout=5).text == "echo /a?x=1"
+        assert session.get(f"{base_url}/missing", timeout=5).status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_torn_last_member_is_dropped(tmp_path):
+    archive_path = str(tmp_path / "capture.jsonl.gz")
+    record(archive_path, ["/a", "/b"])
+    whole = os.path.getsize(archive_path)
+    os.truncate(archive_path, whole - 5)
+
+    assert len(replay.load_archive(archive_path)) == 1
+
+    # Recording again first cuts the torn member off, then appends after it.
+    record(archive_path, ["/c"])
+    assert len(replay.load_archive(archive_path)) == 2
@@ -0,0 +1,100 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from trade_engine import SlidingLeaderboard, TradeEngine
+
+
+def swap(wallet, usd, timestamp, side="buy", pair="p1"):
+    return {
+        "pair": pair,
+        "wallet": wallet,
+        "side": side,
+        "amount": usd,
+        "usd": usd,
+        "timestamp": timestamp,
+    }
+
+
+def summary(records):
+    return [(record.wallet_address, record.volume, record.trades) for record in records]
+
+
+def test_chunks_merge_sorted_once():
+    engine = TradeEngine()
+    engine.append([swap("a", 1, 30), swap("b", 2, 10)])
+    engine.append([swap("c", 3, 20)])
+    assert len(engine.pending) == 2
+
+    assert np.array_equal(engine.timestamp, [10, 20, 30])
+    assert engine.pending == []
+    assert [engine.wallets.values[code] for code in engine.wallet] == ["b", "c", "a"]
+
+
+def test_sliding_window_matches_full_recompute():
+    engine = TradeEngine()
+    sliding = SlidingLeaderboard(engine, "p1", window_seconds=10)
+    rng = np.random.default_rng(0)
+
+    for now in range(10, 100, 5):
+        engine.append(
+            [
+                swap(f"w{rng.integers(5)}", float(rng.integers(1, 50)), now - offset)
+                for offset in (4, 2, 0)
+            ]
+        )
+        sliding.advance(now)
+        expected = engine.leaderboard("p1", start=now - 10, end=now)
+        assert summary(sliding.leaderboard()) == summary(expected)
+
+
+def test_late_swap_inside_window_is_counted():
+    engine = TradeEngine()
+    engine.append([swap("a", 5, 10), swap("b", 3, 20)])
+    sliding = SlidingLeaderboard(engine, "p1", window_seconds=15)
+    sliding.advance(20)
+
+    engine.append([swap("c", 7, 12)])
+    sliding.advance(21)
+    assert summary(sliding.leaderboard()) == summary(
+        engine.leaderboard("p1", start=6, end=21)
+    )
+
+    sliding.advance(40)
+    assert sliding.leaderboard() == []
+    assert all(values.min() >= 0 for values in sliding.totals.values())
+
+
+def fastest_advance(size):
+    """Best time to add one swap and advance a 1h window over ``size`` swaps."""
+    engine = TradeEngine()
+    engine.append(
+        pd.DataFrame(
+            {
+                "pair": "p1",
+                "wallet": (np.arange(size) % (size // 10)).astype(str),
+                "side": "buy",
+                "amount": 1.0,
+                "usd": 1.0,
+                "timestamp": np.arange(size, dtype=np.float64),
+            }
+        )
+    )
+    sliding = SlidingLeaderboard(engine, "p1", window_seconds=3600)
+    sliding.advance(size)
+
+    best = float("inf")
+    for now in range(size + 1, size + 21):
+        engine.append([swap("new", 1.0, now)])
+        started = time.perf_counter()
+        sliding.advance(now)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def test_advance_cost_does_not_grow_with_store():
+    small = fastest_advance(10_000)
+    large = fastest_advance(500_000)
+    # 50x more stored swaps; an O(store) merge would show up as ~50x.
+    assert large < small * 10
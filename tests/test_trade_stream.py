@@ -0,0 +1,150 @@
+import json
+import time
+
+import pytest
+import websocket
+
+import trade_stream
+from trade_stream import TopTraderAggregator, TradeStreamThread, replay_trade_source
+
+TRADES = [
+    {"pair": "p1", "wallet": "a", "side": "buy", "amount": 1, "usd": 100, "timestamp": 1},
+    {"pair": "p1", "wallet": "b", "side": "buy", "amount": 1, "usd": 50, "timestamp": 2},
+    {"pair": "p2", "wallet": "c", "side": "buy", "amount": 1, "usd": 999, "timestamp": 3},
+    {"pair": "p1", "wallet": "b", "side": "sell", "amount": 1, "usd": 80, "timestamp": 4},
+    {"pair": "p1", "wallet": "a", "side": "sell", "amount": 1, "usd": 20, "timestamp": 5},
+]
+
+
+def write_replay(tmp_path):
+    replay_file = tmp_path / "trades.ndjson"
+    replay_file.write_text("".join(json.dumps(trade) + "\n" for trade in TRADES))
+    return str(replay_file)
+
+
+def test_replay_through_aggregator(tmp_path):
+    aggregator = TopTraderAggregator()
+    for trade in replay_trade_source(write_replay(tmp_path), ["p1"], lambda: False):
+        aggregator.add(trade)
+
+    top_traders = aggregator.snapshot(["p1"])
+    assert [
+        (record.wallet_address, record.rank, record.volume, record.pnl, record.trades)
+        for record in top_traders
+    ] == [("b", 1, 130.0, 30.0, 2), ("a", 2, 120.0, -80.0, 2)]
+    assert "p2" not in aggregator.pairs
+
+
+def test_pnl_is_realized_at_average_cost():
+    aggregator = TopTraderAggregator()
+    for trade in [
+        {"pair": "p1", "wallet": "a", "side": "buy", "amount": 2, "usd": 100, "timestamp": 1},
+        {"pair": "p1", "wallet": "a", "side": "sell", "amount": 1, "usd": 80, "timestamp": 2},
+        {"pair": "p1", "wallet": "b", "side": "buy", "amount": 1, "usd": 90, "timestamp": 3},
+    ]:
+        aggregator.add(trade)
+
+    # a sold half its position at 80 against a 50 average cost; b only bought.
+    records = aggregator.top_traders("p1")
+    assert [(record.wallet_address, record.pnl) for record in records] == [
+        ("a", 30.0),
+        ("b", 0.0),
+    ]
+
+
+def test_replay_stops_when_asked(tmp_path):
+    trades = list(replay_trade_source(write_replay(tmp_path), ["p1"], lambda: True))
+    assert trades == []
+
+
+def test_stop_before_start_is_kept(tmp_path):
+    thread = TradeStreamThread(["p1"], replay_file=write_replay(tmp_path))
+    snapshots = []
+    thread.result_signal.connect(snapshots.append)
+    thread.stop()
+    thread.run()
+    assert snapshots == []
+
+
+def test_snapshot_carries_trade_receive_time(tmp_path):
+    thread = TradeStreamThread(["p1"], replay_file=write_replay(tmp_path))
+    snapshots = []
+    thread.result_signal.connect(
+        lambda records, received_at: snapshots.append((records, received_at))
+    )
+    started = time.time()
+    thread.run()
+
+    [(records, received_at)] = snapshots
+    assert [record.wallet_address for record in records] == ["b", "a"]
+    assert started <= received_at <= time.time()
+
+
+class FakeSocket:
+    """Scripted websocket: ``incoming`` is replayed one recv() at a time."""
+
+    def __init__(self, incoming):
+        self.incoming = [json.dumps(message) for message in incoming]
+        self.sent = []
+        self.closed = False
+
+    def settimeout(self, timeout):
+        pass
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+    def recv(self):
+        if not self.incoming:
+            raise websocket.WebSocketTimeoutException()
+        return self.incoming.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+def stream_row(wallet):
+    return {
+        "Block": {"Time": "2024-01-01T00:00:00Z"},
+        "Trade": {
+            "Market": {"MarketAddress": "p1"},
+            "Account": {"Owner": wallet},
+            "Amount": "1",
+            "Side": {"Type": "buy", "AmountInUSD": "10"},
+        },
+    }
+
+
+def test_bitquery_subscribes_after_ack_and_ends_on_complete(monkeypatch):
+    ws = FakeSocket(
+        [
+            {"type": "ping"},
+            {"type": "connection_ack"},
+            {
+                "type": "next",
+                "payload": {"data": {"Solana": {"DEXTradeByTokens": [stream_row("a")]}}},
+            },
+            {"type": "complete", "id": "1"},
+        ]
+    )
+    monkeypatch.setattr(websocket, "create_connection", lambda *args, **kwargs: ws)
+
+    trades = list(trade_stream.bitquery_trade_source(["p1"], lambda: False))
+
+    assert [trade["wallet"] for trade in trades] == ["a"]
+    assert [message["type"] for message in ws.sent] == [
+        "connection_init",
+        "pong",
+        "subscribe",
+    ]
+    assert ws.closed
+
+
+def test_bitquery_gives_up_without_ack(monkeypatch):
+    ws = FakeSocket([])
+    monkeypatch.setattr(websocket, "create_connection", lambda *args, **kwargs: ws)
+    monkeypatch.setattr(trade_stream, "ACK_TIMEOUT_SECONDS", 0)
+
+    with pytest.raises(RuntimeError):
+        list(trade_stream.bitquery_trade_source(["p1"], lambda: False))
+    assert [message["type"] for message in ws.sent] == ["connection_init"]
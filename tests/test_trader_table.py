@@ -0,0 +1,17 @@
+from models import TopTrader
+from trader_table import TopTraderTable
+
+
+def test_pairs_keep_entry_order_and_rank_order():
+    table = TopTraderTable(
+        [
+            TopTrader("zzz", "a", 2),
+            TopTrader("zzz", "b", 1),
+            TopTrader("aaa", "c", 1),
+            TopTrader("aaa", "b", 2),
+        ]
+    )
+    assert table.pairs() == ["zzz", "aaa"]
+    assert table.wallets() == ["b", "a", "c", "b"]
+    assert table.best_rank("b") == 1
+    assert [record.pair_address for record in table.for_wallet("b")] == ["zzz", "aaa"]
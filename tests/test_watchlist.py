@@ -0,0 +1,98 @@
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from models import TopTrader
+from watchlist import FileNotifier, Watchlist, WebhookNotifier
+
+
+class RecordingNotifier:
+    def __init__(self):
+        self.alerts = []
+
+    def notify(self, alert):
+        self.alerts.append(alert)
+
+
+class FailingNotifier:
+    def notify(self, alert):
+        raise OSError("notifier down")
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        self.server.posts.put(json.loads(self.rfile.read(length)))
+        self.send_response(204)
+        self.end_headers()
+
+
+@pytest.fixture
+def webhook():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WebhookHandler)
+    server.posts = queue.Queue()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def watchlist(tmp_path, *notifiers):
+    watched = Watchlist(str(tmp_path / "watchlist.json"), notifiers)
+    watched.add(["w1", "w2"], "whale")
+    return watched
+
+
+def test_alerts_once_per_pair_and_wallet(tmp_path):
+    notifier = RecordingNotifier()
+    watched = watchlist(tmp_path, notifier)
+
+    first = watched.check(
+        [TopTrader("p1", "w1", 3), TopTrader("p1", "other", 1)], time.time()
+    )
+    again = watched.check(
+        [TopTrader("p1", "w1", 2), TopTrader("p2", "w1", 5)], time.time()
+    )
+
+    assert [(alert["pair_address"], alert["rank"]) for alert in first] == [("p1", 3)]
+    assert [(alert["pair_address"], alert["rank"]) for alert in again] == [("p2", 5)]
+    assert notifier.alerts == first + again
+    assert notifier.alerts[0]["note"] == "whale"
+
+
+def test_latency_is_measured_from_fetch(tmp_path):
+    watched = watchlist(tmp_path)
+    fetched_at = time.time() - 2
+    [alert] = watched.check([TopTrader("p1", "w2", 1)], fetched_at)
+    assert alert["fetched_at"] == fetched_at
+    assert 2 <= alert["latency"] < 3
+
+
+def test_notifiers_get_alerts_even_if_one_fails(tmp_path, webhook):
+    alert_file = tmp_path / "alerts.jsonl"
+    url = f"http://127.0.0.1:{webhook.server_port}/"
+    watched = watchlist(
+        tmp_path, FailingNotifier(), FileNotifier(str(alert_file)), WebhookNotifier(url)
+    )
+    [alert] = watched.check([TopTrader("p1", "w1", 1)], time.time())
+
+    assert [json.loads(line) for line in alert_file.read_text().splitlines()] == [alert]
+    posted = webhook.posts.get(timeout=5)
+    assert posted["wallet_address"] == "w1"
+    assert posted["text"].startswith("w1 is #1 on p1")
+
+
+def test_watchlist_persists(tmp_path):
+    watchlist(tmp_path)
+    assert Watchlist(str(tmp_path / "watchlist.json")).wallets == {
+        "w1": "whale",
+        "w2": "whale",
+    }
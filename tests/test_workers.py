@@ -0,0 +1,50 @@
+import time
+
+from workers import Worker
+
+
+class FlakyWorker(Worker):
+    def process(self, chunk):
+        if chunk[0] == 2:
+            raise ValueError("malformed row")
+        return chunk
+
+
+class SlowWorker(Worker):
+    def process(self, chunk):
+        time.sleep(0.05)
+        return chunk
+
+
+def run(worker):
+    emitted = []
+    worker.result_signal.connect(lambda records, fetched_at: emitted.append(records))
+    worker.run()
+    [records] = emitted
+    return records
+
+
+def test_failing_chunk_does_not_drop_later_chunks():
+    assert run(FlakyWorker(range(10), concurrency=2)) == [0, 1, 3, 4, 5, 6, 7, 8, 9]
+
+
+def test_deadline_stops_submitting_and_still_emits():
+    started = time.monotonic()
+    records = run(SlowWorker(range(100), timeout=0.2))
+    assert time.monotonic() - started < 1
+    assert 0 < len(records) < 100
+
+
+def test_each_chunk_is_emitted_with_its_fetch_time():
+    worker = SlowWorker(range(4), chunk_size=2)
+    chunks = []
+    worker.chunk_signal.connect(
+        lambda records, fetched_at: chunks.append((records, fetched_at))
+    )
+    started = time.time()
+    records = run(worker)
+
+    assert [records for records, _ in chunks] == [[0, 1], [2, 3]]
+    first, second = (fetched_at for _, fetched_at in chunks)
+    assert started < first < second <= time.time()
+    assert records == [0, 1, 2, 3]
@@ -0,0 +1,362 @@
+# Compute top trader leaderboards locally from raw swap records.
+
+import bisect
+
+import numpy as np
+import pandas as pd
+
+from models import TopTrader, to_frame
+
+SWAP_COLUMNS = ["pair", "wallet", "side", "amount", "usd", "timestamp"]
+STORED_COLUMNS = {
+    "pair": np.int32,
+    "wallet": np.int32,
+    "side": np.int8,
+    "amount": np.float64,
+    "usd": np.float64,
+    "timestamp": np.float64,
+}
+METRICS = ("volume", "pnl", "trades")
+CHUNK_SIZE = 1_000_000
+
+
+def to_epoch_seconds(values):
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.float64)
+    timestamps = pd.to_datetime(values, utc=True)
+    return timestamps.astype("int64").to_numpy() / 1e9
+
+
+class CodeBook:
+    """Map strings (pairs, wallets) to dense integer codes across chunks."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def encode(self, series):
+        local_codes, uniques = pd.factorize(series)
+        mapping = np.empty(len(uniques), dtype=np.int32)
+        for index, value in enumerate(uniques):
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.values)
+                self.values.append(value)
+            mapping[index] = code
+        return mapping[local_codes]
+
+    def __len__(self):
+        return len(self.values)
+
+
+def stored_column(name):
+    return property(lambda self: self.flush()[name])
+
+
+class TradeEngine:
+    """Columnar swap store kept sorted by timestamp.
+
+    Pairs and wallets are stored as int32 codes, ``side`` as +1 (buy) / -1 (sell),
+    so every leaderboard is a masked ``np.bincount`` over a timestamp slice.
+    Appended chunks are staged and merged once, on the next read. Columns live
+    in buffers with spare capacity, so a merge only writes the new rows (plus
+    any stored rows newer than the earliest of them, which are re-sorted with
+    them) and loading many chunks stays linear.
+    """
+
+    pair = stored_column("pair")
+    wallet = stored_column("wallet")
+    side = stored_column("side")
+    amount = stored_column("amount")
+    usd = stored_column("usd")
+    timestamp = stored_column("timestamp")
+
+    def __init__(self):
+        self.pairs = CodeBook()
+        self.wallets = CodeBook()
+        self.buffers = {
+            name: np.empty(0, dtype=dtype) for name, dtype in STORED_COLUMNS.items()
+        }
+        self.size = 0
+        self.pending = []
+        # (row count after the batch, earliest timestamp in it), one per flush,
+        # so a sliding window can tell when swaps landed behind it.
+        self.batches = []
+
+    @classmethod
+    def from_file(cls, file_path):
+        engine = cls()
+        if file_path.endswith(".parquet"):
+            engine.append(pd.read_parquet(file_path, columns=SWAP_COLUMNS))
+        else:
+            for chunk in pd.read_json(file_path, lines=True, chunksize=CHUNK_SIZE):
+                engine.append(chunk)
+        engine.flush()
+        return engine
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def append(self, swaps):
+        """Add a DataFrame (or list of dicts) of swap records."""
+        if not isinstance(swaps, pd.DataFrame):
+            swaps = pd.DataFrame(swaps, columns=SWAP_COLUMNS)
+        if swaps.empty:
+            return
+
+        pair = self.pairs.encode(swaps["pair"])
+        wallet = self.wallets.encode(swaps["wallet"])
+        side = np.where(swaps["side"].str.lower().to_numpy() == "buy", 1, -1).astype(
+            np.int8
+        )
+        amount = swaps["amount"].to_numpy(dtype=np.float64)
+        usd = swaps["usd"].to_numpy(dtype=np.float64)
+        timestamp = to_epoch_seconds(swaps["timestamp"])
+
+        self.pending.append(
+            {
+                "pair": pair,
+                "wallet": wallet,
+                "side": side,
+                "amount": amount,
+                "usd": usd,
+                "timestamp": timestamp,
+            }
+        )
+
+    @property
+    def stored(self):
+        return {name: values[: self.size] for name, values in self.buffers.items()}
+
+    def reserve(self, count):
+        capacity = len(self.buffers["timestamp"])
+        if count <= capacity:
+            return
+        capacity = max(count, 2 * capacity)
+        for name, values in self.buffers.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[: self.size] = values[: self.size]
+            self.buffers[name] = grown
+
+    def flush(self):
+        """Merge staged chunks into the sorted store and return its columns."""
+        if not self.pending:
+            return self.stored
+        pending, self.pending = self.pending, []
+
+        new = {
+            name: np.concatenate([chunk[name] for chunk in pending])
+            for name in STORED_COLUMNS
+        }
+        earliest = float(new["timestamp"].min())
+        count = self.size + len(new["timestamp"])
+        self.reserve(count)
+
+        # Stored rows at or before the earliest new swap keep their place; the
+        # rest are merged with the new rows. Appends are usually already in
+        # time order, so this tail is usually empty and nothing is re-sorted.
+        stored_timestamp = self.buffers["timestamp"][: self.size]
+        lo = int(np.searchsorted(stored_timestamp, earliest, "right"))
+        tail_timestamp = np.concatenate(
+            [self.buffers["timestamp"][lo : self.size], new["timestamp"]]
+        )
+        order = None
+        if np.any(np.diff(tail_timestamp) < 0):
+            order = np.argsort(tail_timestamp, kind="stable")
+
+        for name, values in new.items():
+            buffer = self.buffers[name]
+            tail = np.concatenate([buffer[lo : self.size], values])
+            buffer[lo:count] = tail if order is None else tail[order]
+
+        self.size = count
+        self.batches.append((count, earliest))
+        return self.stored
+
+    def earliest_since(self, rows):
+        """Earliest timestamp added after the store held ``rows`` rows."""
+        self.flush()
+        first = bisect.bisect_right(self.batches, (rows, np.inf))
+        earliest = [ts for _, ts in self.batches[first:]]
+        return min(earliest) if earliest else None
+
+    def window(self, start=None, end=None):
+        lo = 0 if start is None else np.searchsorted(self.timestamp, start, "left")
+        hi = len(self) if end is None else np.searchsorted(self.timestamp, end, "right")
+        return slice(lo, hi)
+
+    def wallet_sums(self, rows, pair_code):
+        """Bought/sold USD and amounts plus trade counts for one pair's swaps.
+
+        Returns (wallet codes, sums), with one entry per wallet that traded the
+        pair in ``rows``, so the cost follows the slice, not the wallet count.
+        """
+        mask = self.pair[rows] == pair_code
+        codes, wallet = np.unique(self.wallet[rows][mask], return_inverse=True)
+        side = self.side[rows][mask]
+        amount = self.amount[rows][mask]
+        usd = self.usd[rows][mask]
+
+        size = len(codes)
+        buy = side > 0
+        return codes, {
+            "bought_usd": np.bincount(wallet, usd * buy, minlength=size),
+            "sold_usd": np.bincount(wallet, usd * ~buy, minlength=size),
+            "bought_amount": np.bincount(wallet, amount * buy, minlength=size),
+            "sold_amount": np.bincount(wallet, amount * ~buy, minlength=size),
+            "trades": np.bincount(wallet, minlength=size),
+        }
+
+    def wallet_totals(self, rows, pair_code):
+        """``wallet_sums`` spread over arrays indexed by wallet code."""
+        codes, sums = self.wallet_sums(rows, pair_code)
+        totals = {}
+        for key, values in sums.items():
+            totals[key] = np.zeros(len(self.wallets), dtype=values.dtype)
+            totals[key][codes] = values
+        return totals
+
+    def leaderboard(self, pair, metric="volume", start=None, end=None, limit=100):
+        """Return the pair's top ``limit`` wallets as TopTrader records.
+
+        ``start``/``end`` are epoch seconds (inclusive); ``None`` means unbounded.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        pair_code = self.pairs.codes.get(pair)
+        if pair_code is None:
+            return []
+
+        totals = self.wallet_totals(self.window(start, end), pair_code)
+        return rank_wallets(totals, self.wallets.values, pair, metric, limit)
+
+
+def realized_pnl(totals):
+    # Average-cost basis: only the sold amount matched by buys inside the
+    # window is realized, priced at the window's average buy price.
+    bought_amount = totals["bought_amount"]
+    sold_amount = totals["sold_amount"]
+    matched = np.minimum(bought_amount, sold_amount)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_cost = np.where(bought_amount > 0, totals["bought_usd"] / bought_amount, 0)
+        avg_sell = np.where(sold_amount > 0, totals["sold_usd"] / sold_amount, 0)
+    return matched * (avg_sell - avg_cost)
+
+
+def rank_wallets(totals, wallet_values, pair, metric, limit):
+    volume = totals["bought_usd"] + totals["sold_usd"]
+    pnl = realized_pnl(totals)
+    trades = totals["trades"]
+
+    active = np.flatnonzero(trades)
+    score = {"volume": volume, "pnl": pnl, "trades": trades}[metric][active]
+    if limit < len(active):
+        top = np.argpartition(-score, limit - 1)[:limit]
+    else:
+        top = np.arange(len(active))
+    top = top[np.argsort(-score[top], kind="stable")]
+
+    return [
+        TopTrader(
+            pair,
+            wallet_values[code],
+            rank,
+            float(volume[code]),
+            float(pnl[code]),
+            int(trades[code]),
+        )
+        for rank, code in enumerate(active[top], start=1)
+    ]
+
+
+class SlidingLeaderboard:
+    """Keep one pair's per-wallet totals for a moving time window.
+
+    ``advance`` only touches the swaps entering and leaving the window, so
+    refreshing a 24h leaderboard every few seconds costs O(new + expired)
+    (amortized; the totals grow by doubling as new wallets appear).
+    """
+
+    def __init__(self, engine, pair, window_seconds):
+        self.engine = engine
+        self.pair = pair
+        self.window_seconds = window_seconds
+        self.start = None
+        self.end = None
+        self.rows = 0
+        self.totals = None
+
+    def advance(self, now):
+        engine = self.engine
+        pair_code = engine.pairs.codes.get(self.pair)
+        start = now - self.window_seconds
+
+        # A swap appended behind the current end was never counted as
+        # entering, so incremental updates would later subtract it; rebuild.
+        late = engine.earliest_since(self.rows)
+        if late is not None and self.end is not None and late <= self.end:
+            self.totals = None
+
+        if self.totals is None or pair_code is None:
+            if pair_code is not None:
+                self.totals = engine.wallet_totals(engine.window(start, now), pair_code)
+        else:
+            self.reserve(len(engine.wallets))
+
+            # Rows in (old_end, now] enter, rows in [old_start, start) leave.
+            lo = np.searchsorted(engine.timestamp, self.end, "right")
+            hi = np.searchsorted(engine.timestamp, now, "right")
+            entering, entering_sums = engine.wallet_sums(slice(lo, hi), pair_code)
+
+            lo = np.searchsorted(engine.timestamp, self.start, "left")
+            hi = np.searchsorted(engine.timestamp, start, "left")
+            leaving, leaving_sums = engine.wallet_sums(slice(lo, hi), pair_code)
+
+            for key, values in self.totals.items():
+                values[entering] += entering_sums[key]
+                values[leaving] -= leaving_sums[key]
+
+        self.start, self.end = start, now
+        self.rows = len(engine)
+
+    def reserve(self, size):
+        capacity = len(self.totals["trades"])
+        if size > capacity:
+            capacity = max(size, 2 * capacity)
+            for key, values in self.totals.items():
+                self.totals[key] = np.pad(values, (0, capacity - len(values)))
+
+    def leaderboard(self, metric="volume", limit=100):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        if self.totals is None:
+            return []
+        return rank_wallets(
+            self.totals, self.engine.wallets.values, self.pair, metric, limit
+        )
+
+
+def main():
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Top traders from raw swaps.")
+    parser.add_argument("swap_file", help="NDJSON or Parquet swap records")
+    parser.add_argument("pair_address", nargs="+")
+    parser.add_argument("--metric", choices=METRICS, default="volume")
+    parser.add_argument("--start", type=float, help="epoch seconds")
+    parser.add_argument("--end", type=float, help="epoch seconds")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    engine = TradeEngine.from_file(args.swap_file)
+    top_trader_list = []
+    for pair in args.pair_address:
+        top_trader_list.extend(
+            engine.leaderboard(pair, args.metric, args.start, args.end, args.limit)
+        )
+    to_frame(TopTrader, top_trader_list).to_csv(sys.stdout, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# Live top trader tracking from individual trades (Bitquery stream or local replay).
+
+import os
+import json
+import time
+import threading
+import numpy as np
+from dotenv import load_dotenv
+from PyQt5.QtCore import QThread, pyqtSignal
+from models import TopTrader
+from trade_engine import realized_pnl
+
+load_dotenv()
+bitquery_api = os.getenv("BITQUERY_API_KEY")
+trade_replay_file = os.getenv("TRADE_REPLAY_FILE")
+
+BITQUERY_STREAM_URL = "wss://streaming.bitquery.io/eap"
+SOL_MINT_ADDRESS = "So11111111111111111111111111111111111111112"
+TOP_TRADER_LIMIT = 100
+DEBOUNCE_SECONDS = 1.0
+ACK_TIMEOUT_SECONDS = 10
+
+TRADE_SUBSCRIPTION = """subscription LiveTrades($pairs: [String!], $base: String!) {
+    Solana {
+        DEXTradeByTokens(
+            where: {Trade: {Market: {MarketAddress: {in: $pairs}}, Side: {Currency: {MintAddress: {is: $base}}}}, Transaction: {Result: {Success: true}}}
+        ) {
+            Block {
+                Time
+            }
+            Trade {
+                Market {
+                    MarketAddress
+                }
+                Account {
+                    Owner
+                }
+                Amount
+                Side {
+                    Type
+                    AmountInUSD
+                }
+            }
+        }
+    }
+}
+"""
+
+
+class TopTraderAggregator:
+    """Running per-pair wallet totals built from individual trade records.
+
+    A trade record is a dict with ``pair``, ``wallet``, ``side`` ("buy"/"sell"),
+    ``amount``, ``usd`` and ``timestamp`` keys. PnL is realized at average
+    cost, the same way ``trade_engine`` computes it.
+    """
+
+    def __init__(self, limit=TOP_TRADER_LIMIT):
+        self.limit = limit
+        self.pairs = {}
+
+    def add(self, trade):
+        wallets = self.pairs.setdefault(trade["pair"], {})
+        stats = wallets.get(trade["wallet"])
+        if stats is None:
+            stats = wallets[trade["wallet"]] = {
+                "volume": 0.0,
+                "bought_usd": 0.0,
+                "sold_usd": 0.0,
+                "bought_amount": 0.0,
+                "sold_amount": 0.0,
+                "trades": 0,
+            }
+        usd = float(trade["usd"])
+        amount = float(trade["amount"])
+        stats["volume"] += usd
+        stats["trades"] += 1
+        if trade["side"] == "buy":
+            stats["bought_usd"] += usd
+            stats["bought_amount"] += amount
+        else:
+            stats["sold_usd"] += usd
+            stats["sold_amount"] += amount
+
+    def top_traders(self, pair):
+        wallets = self.pairs.get(pair, {})
+        ranked = sorted(wallets.items(), key=lambda kv: kv[1]["volume"], reverse=True)
+        ranked = ranked[: self.limit]
+        pnl = realized_pnl(
+            {
+                key: np.array([stats[key] for _, stats in ranked], dtype=np.float64)
+                for key in ("bought_usd", "sold_usd", "bought_amount", "sold_amount")
+            }
+        )
+        return [
+            TopTrader(
+                pair,
+                wallet,
+                rank,
+                stats["volume"],
+                float(pnl[rank - 1]),
+                stats["trades"],
+            )
+            for rank, (wallet, stats) in enumerate(ranked, start=1)
+        ]
+
+    def snapshot(self, pair_address_list):
+        top_trader_list = []
+        for pair in pair_address_list:
+            top_trader_list.extend(self.top_traders(pair))
+        return top_trader_list
+
+
+def wait_for_ack(ws, should_stop):
+    """Read messages until the server acknowledges ``connection_init``.
+
+    graphql-transport-ws servers may close the socket (4401) on a subscribe
+    sent before the ack.
+    """
+    import websocket
+
+    deadline = time.monotonic() + ACK_TIMEOUT_SECONDS
+    while not should_stop():
+        if time.monotonic() > deadline:
+            raise RuntimeError("Bitquery did not acknowledge the connection")
+        try:
+            message = json.loads(ws.recv())
+        except websocket.WebSocketTimeoutException:
+            continue
+
+        if message.get("type") == "connection_ack":
+            return True
+        if message.get("type") == "ping":
+            ws.send(json.dumps({"type": "pong"}))
+    return False
+
+
+def bitquery_trade_source(pair_address_list, should_stop):
+    """Yield trade records from the Bitquery websocket, or None while idle."""
+    import websocket
+
+    ws = websocket.create_connection(
+        BITQUERY_STREAM_URL,
+        subprotocols=["graphql-transport-ws"],
+        header=[f"Authorization: Bearer {bitquery_api}"],
+    )
+    try:
+        ws.settimeout(DEBOUNCE_SECONDS)
+        ws.send(json.dumps({"type": "connection_init"}))
+        if not wait_for_ack(ws, should_stop):
+            return
+        ws.send(
+            json.dumps(
+                {
+                    "id": "1",
+                    "type": "subscribe",
+                    "payload": {
+                        "query": TRADE_SUBSCRIPTION,
+                        "variables": {
+                            "pairs": pair_address_list,
+                            "base": SOL_MINT_ADDRESS,
+                        },
+                    },
+                }
+            )
+        )
+
+        while not should_stop():
+            try:
+                message = json.loads(ws.recv())
+            except websocket.WebSocketTimeoutException:
+                yield None
+                continue
+
+            if message.get("type") == "ping":
+                ws.send(json.dumps({"type": "pong"}))
+                continue
+            if message.get("type") == "error":
+                raise RuntimeError(f"Bitquery subscription error: {message}")
+            if message.get("type") == "complete":
+                return
+            if message.get("type") != "next":
+                continue
+
+            rows = message["payload"]["data"]["Solana"]["DEXTradeByTokens"]
+            for row in rows:
+                trade = row["Trade"]
+                yield {
+                    "pair": trade["Market"]["MarketAddress"],
+                    "wallet": trade["Account"]["Owner"],
+                    "side": trade["Side"]["Type"],
+                    "amount": float(trade["Amount"]),
+                    "usd": float(trade["Side"]["AmountInUSD"] or 0),
+                    "timestamp": row["Block"]["Time"],
+                }
+    finally:
+        ws.close()
+
+
+def replay_trade_source(file_path, pair_address_list, should_stop, speed=0):
+    """Yield trade records from a local NDJSON capture.
+
+    With ``speed`` > 0 the gaps between numeric ``timestamp`` values are replayed
+    in real time divided by ``speed``; with 0 the file is read as fast as possible.
+    """
+    pairs = set(pair_address_list)
+    previous_timestamp = None
+
+    with open(file_path, "r", encoding="utf-8") as replay_file:
+        for line in replay_file:
+            if should_stop():
+                return
+            if not line.strip():
+                continue
+
+            trade = json.loads(line)
+            if trade["pair"] not in pairs:
+                continue
+
+            if speed > 0 and previous_timestamp is not None:
+                delay = (float(trade["timestamp"]) - previous_timestamp) / speed
+                if delay > 0:
+                    time.sleep(delay)
+                    yield None
+            previous_timestamp = float(trade["timestamp"])
+            yield trade
+
+
+class TradeStreamThread(QThread):
+    """Stream trades into a TopTraderAggregator and emit debounced snapshots.
+
+    Each snapshot is sent with the ``time.time()`` at which the oldest trade
+    it newly includes was received, so alert latency covers the debounce.
+    """
+
+    result_signal = pyqtSignal(list, float)
+
+    def __init__(self, pair_address_list, replay_file=None, replay_speed=0):
+        super().__init__()
+        self.pair_address_list = pair_address_list
+        self.replay_file = replay_file or trade_replay_file
+        self.replay_speed = replay_speed
+        self.aggregator = TopTraderAggregator()
+        # Created up front so a stop() that lands before run() still counts.
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        try:
+            self.consume(self.trade_source())
+        except Exception as e:
+            print(f"Error streaming top trader data: {e}")
+
+    def trade_source(self):
+        should_stop = self.stop_event.is_set
+        if self.replay_file:
+            return replay_trade_source(
+                self.replay_file,
+                self.pair_address_list,
+                should_stop,
+                self.replay_speed,
+            )
+        return bitquery_trade_source(self.pair_address_list, should_stop)
+
+    def consume(self, trades):
+        # Trades are folded in as they arrive; the UI only sees a fresh ranking
+        # once per debounce window so bursts don't flood the event loop.
+        received_at = None
+        last_emit = time.monotonic()
+
+        for trade in trades:
+            if self.stop_event.is_set():
+                break
+            if trade is not None:
+                self.aggregator.add(trade)
+                if received_at is None:
+                    received_at = time.time()
+
+            due = time.monotonic() - last_emit >= DEBOUNCE_SECONDS
+            if received_at is not None and due:
+                self.emit_snapshot(received_at)
+                received_at = None
+                last_emit = time.monotonic()
+
+        if received_at is not None:
+            self.emit_snapshot(received_at)
+
+    def emit_snapshot(self, received_at):
+        self.result_signal.emit(
+            self.aggregator.snapshot(self.pair_address_list), received_at
+        )
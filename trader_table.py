@@ -0,0 +1,72 @@
+# Columnar store of (pair, wallet, rank, stats) top trader rows with lookup indexes.
+
+import numpy as np
+import pandas as pd
+
+from models import TopTrader, to_columns, from_columns
+
+
+class TopTraderTable:
+    """Top trader rows kept as one array per field, indexed by pair and wallet.
+
+    ``by_pair`` and ``by_wallet`` map a key to the row numbers holding it, and
+    ``best`` maps each wallet to its minimum-rank row, so per-pair listings,
+    per-wallet joins and best-rank lookups are dictionary hits.
+    """
+
+    def __init__(self, records=()):
+        records = list(records)
+        self.columns = to_columns(TopTrader, records)
+        self.by_pair = {}
+        self.by_wallet = {}
+        self.best = {}
+
+        pair = self.columns["pair_address"]
+        wallet = self.columns["wallet_address"]
+        rank = self.columns["rank"]
+        # Pairs keep the order they first appear in (the order the user
+        # entered them), with rows in rank order inside each pair.
+        pair_order, _ = pd.factorize(pair)
+        for index in np.lexsort((rank, pair_order)):
+            self.by_pair.setdefault(pair[index], []).append(index)
+        for index in np.argsort(rank, kind="stable"):
+            self.by_wallet.setdefault(wallet[index], []).append(index)
+            self.best.setdefault(wallet[index], index)
+
+    def __len__(self):
+        return len(self.columns["rank"])
+
+    def take(self, rows):
+        return from_columns(
+            TopTrader,
+            {name: values[rows] for name, values in self.columns.items()},
+        )
+
+    def records(self):
+        return self.take(np.arange(len(self)))
+
+    def pairs(self):
+        return list(self.by_pair)
+
+    def for_pair(self, pair_address):
+        """Rows for one pair in rank order."""
+        return self.take(np.asarray(self.by_pair.get(pair_address, []), dtype=np.int64))
+
+    def for_wallet(self, wallet_address):
+        """Every pair a wallet ranks in, best rank first."""
+        rows = self.by_wallet.get(wallet_address, [])
+        return self.take(np.asarray(rows, dtype=np.int64))
+
+    def best_rank(self, wallet_address):
+        index = self.best.get(wallet_address)
+        if index is None:
+            return None
+        return int(self.columns["rank"][index])
+
+    def wallets(self):
+        """Wallet addresses in per-pair rank order, as shown in the viewer."""
+        return [
+            self.columns["wallet_address"][index]
+            for rows in self.by_pair.values()
+            for index in rows
+        ]
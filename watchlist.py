@@ -0,0 +1,122 @@
+# Tracked wallets and alerts when they show up in a new top trader batch.
+
+import os
+import json
+import time
+import threading
+import requests
+
+WATCHLIST_FILE = "watchlist.json"
+ALERT_FILE = "watchlist_alerts.jsonl"
+
+
+class Watchlist:
+    """Wallets to watch, persisted as JSON; checking a batch costs O(batch)."""
+
+    def __init__(self, path=WATCHLIST_FILE, notifiers=()):
+        self.path = path
+        self.notifiers = list(notifiers)
+        self.wallets = {}
+        self.seen = set()
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as watchlist_file:
+                for wallet_address, note in json.load(watchlist_file).items():
+                    self.track(wallet_address, note)
+
+    def __len__(self):
+        return len(self.wallets)
+
+    def __contains__(self, wallet_address):
+        return wallet_address in self.wallets
+
+    def track(self, wallet_address, note=""):
+        self.wallets[wallet_address] = note
+
+    def add(self, wallet_addresses, note=""):
+        for wallet_address in wallet_addresses:
+            self.track(str(wallet_address), note)
+        self.save()
+
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as watchlist_file:
+            json.dump(self.wallets, watchlist_file, indent=4)
+
+    def check(self, top_trader_list, fetched_at):
+        """Alert on tracked wallets newly seen in a pair's top traders.
+
+        ``fetched_at`` is the ``time.time()`` at which the batch came back from
+        upstream; each alert carries the fetch-to-alert latency in seconds.
+        """
+        alerts = []
+        for top_trader in top_trader_list:
+            if top_trader.wallet_address not in self:
+                continue
+            key = (top_trader.pair_address, top_trader.wallet_address)
+            if key in self.seen:
+                continue
+            self.seen.add(key)
+            alerts.append(
+                {
+                    "wallet_address": top_trader.wallet_address,
+                    "pair_address": top_trader.pair_address,
+                    "rank": top_trader.rank,
+                    "note": self.wallets[top_trader.wallet_address],
+                    "fetched_at": fetched_at,
+                    "latency": time.time() - fetched_at,
+                }
+            )
+
+        for notifier in self.notifiers:
+            for alert in alerts:
+                try:
+                    notifier.notify(alert)
+                except Exception as e:
+                    print(f"Error sending watchlist alert: {e}")
+        return alerts
+
+
+def alert_message(alert):
+    return (
+        f"{alert['wallet_address']} is #{alert['rank']} on {alert['pair_address']} "
+        f"({alert['latency'] * 1000:.0f} ms after fetch)"
+    )
+
+
+class FileNotifier:
+    def __init__(self, path=ALERT_FILE):
+        self.path = path
+
+    def notify(self, alert):
+        with open(self.path, "a", encoding="utf-8") as alert_file:
+            alert_file.write(json.dumps(alert) + "\n")
+
+
+class WebhookNotifier:
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def notify(self, alert):
+        # Posted off the UI thread so a slow endpoint can't stall the viewer.
+        threading.Thread(target=self.post, args=(alert,), daemon=True).start()
+
+    def post(self, alert):
+        try:
+            requests.post(
+                self.url,
+                json=dict(alert, text=alert_message(alert)),
+                timeout=self.timeout,
+            )
+        except requests.exceptions.RequestException as e:
+            print(f"Webhook alert failed: {e}")
+
+
+class DesktopNotifier:
+    """Show alerts as tray balloons; ``tray_icon`` is a visible QSystemTrayIcon."""
+
+    def __init__(self, tray_icon):
+        self.tray_icon = tray_icon
+
+    def notify(self, alert):
+        self.tray_icon.showMessage("Watchlist", alert_message(alert))
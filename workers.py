@@ -0,0 +1,111 @@
+# Base QThread for cancellable, deadline-bound batch fetches.
+
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from fetchers import REQUEST_TIMEOUT
+
+RUN_TIMEOUT = 1800
+
+
+class Worker(QThread):
+    """Run ``process`` over chunks of ``items`` and emit the combined result.
+
+    At most ``concurrency`` chunks run at once and at most twice that many are
+    queued, so a cancelled or timed-out run stops submitting work almost
+    immediately. A chunk that raises is logged and skipped; the rest still
+    run. ``chunk_signal`` fires for each chunk that returned results, with the
+    ``time.time()`` its fetch finished, so alerts don't wait for the whole
+    run. ``result_signal`` always fires exactly once, with whatever finished
+    before a cancel or deadline and the ``time.time()`` the run ended, so the
+    UI can never be left waiting. ``progress_signal`` reports (finished
+    chunks, total chunks).
+    """
+
+    chunk_signal = pyqtSignal(list, float)
+    result_signal = pyqtSignal(list, float)
+    progress_signal = pyqtSignal(int, int)
+    error_message = "Error fetching data"
+
+    def __init__(self, items=(None,), chunk_size=1, concurrency=1, timeout=RUN_TIMEOUT):
+        super().__init__()
+        self.items = list(items)
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.deadline = None
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set() or (
+            self.deadline is not None and time.monotonic() >= self.deadline
+        )
+
+    def request_timeout(self):
+        """Per-request timeout that never outlives the run's deadline."""
+        if self.deadline is None:
+            return REQUEST_TIMEOUT
+        return max(0.1, min(REQUEST_TIMEOUT, self.deadline - time.monotonic()))
+
+    def chunks(self):
+        return [
+            self.items[index : index + self.chunk_size]
+            for index in range(0, len(self.items), self.chunk_size)
+        ]
+
+    def process(self, chunk):
+        raise NotImplementedError
+
+    def process_chunk(self, chunk):
+        try:
+            results = self.process(chunk)
+        except Exception as e:
+            print(f"{self.error_message}: {e}")
+            results = []
+        return results, time.time()
+
+    def run(self):
+        if self.timeout is not None:
+            self.deadline = time.monotonic() + self.timeout
+        results = []
+        try:
+            for chunk_result, fetched_at in self.iter_results():
+                results.extend(chunk_result)
+                if chunk_result:
+                    self.chunk_signal.emit(chunk_result, fetched_at)
+        except Exception as e:
+            print(f"{self.error_message}: {e}")
+        if self.is_cancelled():
+            print(f"{type(self).__name__} stopped early with {len(results)} results")
+        self.result_signal.emit(results, time.time())
+
+    def iter_results(self):
+        chunks = self.chunks()
+        done = 0
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for chunk in chunks:
+                if self.is_cancelled():
+                    break
+                pending.append(executor.submit(self.process_chunk, chunk))
+                if len(pending) >= self.concurrency * 2:
+                    done += 1
+                    yield pending.popleft().result()
+                    self.progress_signal.emit(done, len(chunks))
+
+            while pending:
+                if self.is_cancelled():
+                    for future in pending:
+                        future.cancel()
+                    break
+                done += 1
+                yield pending.popleft().result()
+                self.progress_signal.emit(done, len(chunks))